@@ -5,6 +5,7 @@ from parapy.webgui import mui
 from parapy.webgui import viewer
 from parapy.exchange import STEPWriter
 from AA_Initialization import WING
+from wingbox_code.geometry.geometry_tools.lod import refined
 import numpy as np
 # fppkbe2023
 # cyj8kS8VVN60
@@ -44,6 +45,11 @@ class App(Component):
                                        )[
                                 "NASTRAN"
                             ],
+                            mui.Button(variant='outlined',
+                                       onClick=self.refine_view
+                                       )[
+                                "REFINE"
+                            ],
                     ]),
             layout.Split(height='100%',
                          weights=[0, 0, 1])[
@@ -57,7 +63,7 @@ class App(Component):
     # def DISPLAY(self):
     #     return [WING.wing_geom.right_wing]
 
-    DISPLAY: list = State([WING.wing_geom.right_wing, WING.wing_geom.left_wing])
+    DISPLAY: list = State([WING.right_wing_view, WING.left_wing_view])
 
     # @property
     # def DISPLAY(self):
@@ -69,21 +75,27 @@ class App(Component):
     #     self.DISPLAY = val
 
     def geom_view(self, evt):
-        self.DISPLAY = [WING.wing_geom.right_wing]
+        self.DISPLAY = [WING.right_wing_view]
         return
 
     def avl_view(self, evt):
-        self.DISPLAY = [[WING.wing_geom.right_wing, WING.wing_geom.left_wing]]
+        self.DISPLAY = [[WING.right_wing_view, WING.left_wing_view]]
         return
 
     def struc_view(self, evt):
-        self.DISPLAY = [WING.wingbox.spars, WING.wingbox.ribs, WING.wingbox.stringers]
+        self.DISPLAY = [WING.structure_view]
         return
 
     def nastran_view(self, evt):
         self.DISPLAY = []
         return
 
+    def refine_view(self, evt):
+        # Views start coarse and are refined on demand; only their tessellation is redone
+        WING.lod = refined(WING.lod)
+        self.DISPLAY = list(self.DISPLAY)
+        return
+
 
 
 class InputsPanel(Component):
@@ -0,0 +1,42 @@
+"""
+Headless runner of the wingbox model. It never imports the GUI.
+
+    python -m wingbox_code wingbox_user_inputs.xlsx --stages geometry,avl,wingbox,mesh
+    python -m wingbox_code wingbox_user_inputs.xlsx --stages geometry,wingbox --profile wingbox_profile
+"""
+import argparse
+import sys
+from .runner import STAGES, load_run_inputs, run_stages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m wingbox_code',
+                                     description='Runs selected stages of the wingbox assessment without GUI.')
+    parser.add_argument('inputs', help='input snapshot (.json) or input workbook (.xlsx)')
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help='comma-separated stages among {} (default: all)'.format(','.join(STAGES)))
+    parser.add_argument('--workers', type=int, default=1,
+                        help='processes used to build the wingbox components (default: 1)')
+    parser.add_argument('--profile', metavar='PREFIX',
+                        help='profile the model slots, writes PREFIX.txt (report) and PREFIX.folded (flame graph)')
+    args = parser.parse_args(argv)
+
+    inputs, input_warnings = load_run_inputs(args.inputs)
+    for header, msg in input_warnings:
+        print('{}: {}'.format(header, msg), file=sys.stderr)
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    if args.profile:
+        from .profiler import SlotProfiler
+        with SlotProfiler() as profiler:
+            run_stages(inputs, stages, workers=args.workers)
+        profiler.write_report(args.profile + '.txt')
+        profiler.write_folded(args.profile + '.folded')
+        print(profiler.report(limit=20))
+    else:
+        run_stages(inputs, stages, workers=args.workers)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,7 +2,7 @@ from parapy.core import *
 from kbeutils import avl
 from parapy.core.validate import *
 from .avl_tools.flight_condition import FlightCondition
-from ..format.tk_warn import type_warning
+from ..format.input_validation import check_case_settings
 
 
 class AvlAnalysis(avl.Interface):
@@ -21,29 +21,7 @@ class AvlAnalysis(avl.Interface):
         :param cases:
         :return:
         """
-
-        for i in cases:
-            if len(i) != self.n_loads:
-                msg = 'The number of load cases must be coherent.' \
-                      ' If you want to add/remove load cases, change n_loads'
-                return False, msg
-
-        for i in cases[0]:
-            warn, msg = type_warning(i, 'load case names', str)
-            if not warn:
-                return False, msg
-
-        for i in cases[1]:
-            if i != 'alpha' and i != 'CL':
-                msg = 'Invalid load case variable name. Please use either "alpha" or "CL"'
-                return False, msg
-
-        for i in cases[2]:
-            warn, msg = type_warning(i, 'load case variable value', (float, int))
-            if not warn:
-                return False, msg
-
-        return True
+        return check_case_settings(cases, self.n_loads)
 
     @Attribute
     def case_input(self):
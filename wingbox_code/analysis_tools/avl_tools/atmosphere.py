@@ -0,0 +1,114 @@
+from functools import lru_cache
+import numpy as np
+import os
+
+
+ATMOS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'atmos_params.csv')
+
+# Columns of the table kept for the interpolation: height, temperature, pressure, density, sound speed,
+# viscosity and kinematic viscosity.
+ATMOS_COLUMNS = [0, 4, 5, 6, 7, 8, 9]
+
+# Conversion constants from imperial to SI, in the same order as ATMOS_COLUMNS.
+ATMOS_SI = np.array([0.3048, 5/9, 47.8803, 515.379, 0.3048, 14.5939/0.3048, 0.3048**2])
+
+# Height limits of the table [ft].
+H_MIN, H_MAX = -1e3, 65e3
+
+# ISA constants.
+R_AIR = 287.05287  # J/kg.K
+GAMMA = 1.4
+G0 = 9.80665  # m/s2
+ISA_LAYERS = [(0., 288.15, 101325., -0.0065),  # base height [m], temperature [K], pressure [Pa], lapse [K/m]
+              (11000., 216.65, 22632.06, 0.),
+              (20000., 216.65, 5474.889, 0.001),
+              (32000., 228.65, 868.0187, 0.)]
+
+
+@lru_cache(maxsize=None)
+def atmos_table(path=ATMOS_PATH):
+    """
+    Parses the atmospheric parameters table once per process.
+    :param path: path to the .csv table, in imperial units
+    :return: read-only array with the columns of ATMOS_COLUMNS, height in ft
+    """
+    atmos_matrix = np.genfromtxt(path, delimiter=',', dtype=float, skip_header=True)
+    atmos_matrix[:, 0] *= 1e3  # Converting from flight level to height.
+    atmos_matrix[:, 8] *= 1e-6  # Converting from 10^(-6) slug/ft.s to slug/ft.s
+
+    table = np.ascontiguousarray(atmos_matrix[:, ATMOS_COLUMNS])
+    table.flags.writeable = False
+    return table
+
+
+def table_atmosphere(height, path=ATMOS_PATH):
+    """
+    Linearly interpolates the tabulated atmosphere for any number of heights in a single pass.
+    :param height: height(s) [ft]
+    :param path: path to the .csv table
+    :return: array of shape (n, 7) in imperial units, NaN rows outside of the table
+    """
+    table = atmos_table(path)
+    h = np.atleast_1d(np.asarray(height, dtype=float))
+
+    # Bracketing rows and interpolation weights, shared by every column.
+    idx = np.clip(np.searchsorted(table[:, 0], h, side='right') - 1, 0, len(table) - 2)
+    ratio = (h - table[idx, 0]) / (table[idx + 1, 0] - table[idx, 0])
+    values = table[idx] + (table[idx + 1] - table[idx]) * ratio[:, None]
+
+    values[(h < table[0, 0]) | (h > table[-1, 0])] = np.nan
+    return values
+
+
+def isa_atmosphere(height):
+    """
+    Closed-form International Standard Atmosphere, which does not need the table.
+    :param height: height(s) [ft]
+    :return: array of shape (n, 7) in imperial units, same columns as table_atmosphere
+    """
+    h = np.atleast_1d(np.asarray(height, dtype=float)) * 0.3048
+
+    bases = np.array([layer[0] for layer in ISA_LAYERS])
+    layer = np.clip(np.searchsorted(bases, h, side='right') - 1, 0, len(ISA_LAYERS) - 1)
+    h_b, t_b, p_b, lapse = (np.array([layer_i[k] for layer_i in ISA_LAYERS])[layer] for k in range(4))
+
+    dh = h - h_b
+    temp = t_b + lapse * dh
+    with np.errstate(divide='ignore', invalid='ignore'):
+        press = np.where(lapse == 0,
+                         p_b * np.exp(-G0 * dh / (R_AIR * t_b)),
+                         p_b * (temp / t_b) ** (-G0 / (np.where(lapse == 0, 1, lapse) * R_AIR)))
+    dens = press / (R_AIR * temp)
+    sound = np.sqrt(GAMMA * R_AIR * temp)
+    visc = 1.458e-6 * temp ** 1.5 / (temp + 110.4)  # Sutherland's law.
+    k_visc = visc / dens
+
+    values = np.column_stack((h, temp, press, dens, sound, visc, k_visc)) / ATMOS_SI
+    values[(h < H_MIN * 0.3048) | (h > H_MAX * 0.3048)] = np.nan
+    return values
+
+
+def atmosphere(height, speed=None, model='table', units='SI', path=ATMOS_PATH):
+    """
+    Evaluates the atmosphere for arrays of heights and, optionally, speeds.
+    :param height: height(s) [ft]
+    :param speed: speed(s), same units as the output. Broadcast against height
+    :param model: 'table' to interpolate atmos_params.csv, 'isa' for the closed-form ISA
+    :param units: 'SI' or 'imperial' for the output
+    :return: dict of arrays: h, T, p, rho, a, mu, nu and Mach (only if speed is given)
+    """
+    if model == 'table':
+        values = table_atmosphere(height, path)
+    elif model == 'isa':
+        values = isa_atmosphere(height)
+    else:
+        raise ValueError("Atmosphere model must be 'table' or 'isa', got {}".format(model))
+
+    if units == 'SI':
+        values = values * ATMOS_SI
+
+    atmos = dict(zip(['h', 'T', 'p', 'rho', 'a', 'mu', 'nu'], values.T))
+    if speed is not None:
+        atmos['Mach'] = np.asarray(speed, dtype=float) / atmos['a']
+
+    return atmos
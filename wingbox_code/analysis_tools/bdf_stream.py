@@ -0,0 +1,141 @@
+"""
+Array-backed writing of the bulk data of the mesh. Node coordinates and element connectivity are gathered into
+NumPy arrays once and formatted in chunks straight into the .bdf file, without one Python card object per node or
+element. Reals use large-field cards to keep their precision.
+"""
+import os
+import tempfile
+import numpy as np
+
+
+CHUNK = 20000  # Rows formatted per write
+
+GRID_FMT = 'GRID*   %16d                %16.9E%16.9E\n*       %16.9E'
+ELEMENT_FMT = {'CTRIA3': 'CTRIA3  %8d%8d%8d%8d%8d',
+               'CQUAD4': 'CQUAD4  %8d%8d%8d%8d%8d%8d'}
+
+
+def mesh_arrays(grid):
+    """
+    Nodes and shell elements of a mesh grid as arrays. Elements are numbered in the order of the grid faces.
+    :param grid: mesh grid (Mesh.grid)
+    :return: dict with node ids (n,), node coordinates (n, 3) and, per element type, element ids and connectivity
+    """
+    nodes = grid.nodes
+    node_ids = np.fromiter((node.mesh_id for node in nodes), dtype=np.int64, count=len(nodes))
+    coords = np.array([(node.x, node.y, node.z) for node in nodes], dtype=float).reshape(-1, 3)
+
+    connectivity = {3: [], 4: []}
+    element_ids = {3: [], 4: []}
+    eid = 0
+    for face in grid.faces:
+        face_nodes = [node.mesh_id for node in face.nodes]
+        if len(face_nodes) in connectivity:
+            eid += 1
+            connectivity[len(face_nodes)].append(face_nodes)
+            element_ids[len(face_nodes)].append(eid)
+
+    arrays = {'node_ids': node_ids, 'coords': coords}
+    for card, n in [('CTRIA3', 3), ('CQUAD4', 4)]:
+        arrays[card] = (np.array(element_ids[n], dtype=np.int64),
+                        np.array(connectivity[n], dtype=np.int64).reshape(-1, n))
+    return arrays
+
+
+def _write_rows(file, rows, fmt, chunk=CHUNK):
+    for start in range(0, len(rows), chunk):
+        np.savetxt(file, rows[start:start + chunk], fmt=fmt)
+
+
+def write_grids(file, node_ids, coords, chunk=CHUNK):
+    rows = np.column_stack([node_ids, coords])
+    _write_rows(file, rows, GRID_FMT, chunk)
+
+
+def write_elements(file, card, element_ids, connectivity, pid, chunk=CHUNK):
+    rows = np.column_stack([element_ids, np.full(len(element_ids), pid, dtype=np.int64), connectivity])
+    _write_rows(file, rows, ELEMENT_FMT[card], chunk)
+
+
+def write_mat1(file, mid, E, nu, rho):
+    file.write('MAT1*   %16d%16.9E                %16.9E\n*       %16.9E\n' % (mid, E, nu, rho))
+
+
+def write_pshell(file, pid, mid, t):
+    file.write('PSHELL* %16d%16d%16.9E%16d\n*                       %16d\n' % (pid, mid, t, mid, mid))
+
+
+def render_writer(writer):
+    """
+    Renders a parapy.lib.nastran Writer to a string. The template only holds the executive and case control and
+    the load entries, not the mesh.
+    :param writer: Writer
+    :return: rendered .bdf contents
+    """
+    handle, path = tempfile.mkstemp(suffix='.bdf')
+    os.close(handle)
+    try:
+        writer.write(path)
+        with open(path, 'r') as file:
+            return file.read()
+    finally:
+        os.remove(path)
+
+
+def write_deck(path, rendered, write_cards):
+    """
+    Writes a .bdf file in a single pass: the rendered template up to the end of its bulk data, the streamed cards,
+    then ENDDATA.
+    :param path: path to the .bdf file
+    :param rendered: rendered template, see render_writer
+    :param write_cards: function taking the open file and writing the cards to it
+    :return: None
+    """
+    lines = rendered.splitlines(keepends=True)
+    end = max([i for i, line in enumerate(lines) if line.strip().upper().startswith('ENDDATA')], default=len(lines))
+
+    with open(path, 'w') as file:
+        file.writelines(lines[:end])
+        write_cards(file)
+        file.writelines(lines[end:] if end < len(lines) else ['ENDDATA\n'])
+
+
+def id_ranges(ids):
+    """
+    Splits sorted ids into runs of consecutive ids
+    :param ids: sorted integer ids
+    :return: list of (first, last)
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    if not len(ids):
+        return []
+    breaks = np.flatnonzero(np.diff(ids) != 1)
+    starts = np.concatenate([[0], breaks + 1])
+    ends = np.concatenate([breaks, [len(ids) - 1]])
+    return list(zip(ids[starts].tolist(), ids[ends].tolist()))
+
+
+def write_spc1(file, sid, components, node_ids, min_range=3):
+    """
+    Writes SPC1 cards constraining a node set. Runs of at least min_range consecutive ids are written as THRU
+    ranges, the remaining ids are listed on a single card.
+    :param file: open file, positioned in the bulk data
+    :param sid: SPC set id
+    :param components: constrained components, e.g. '123456'
+    :param node_ids: sorted node ids
+    :param min_range: shortest run written as a THRU range
+    :return: None
+    """
+    head = 'SPC1    %8d%8s' % (sid, components)
+    single = []
+    for first, last in id_ranges(node_ids):
+        if last - first + 1 >= min_range:
+            file.write(head + '%8d    THRU%8d\n' % (first, last))
+        else:
+            single.extend(range(first, last + 1))
+
+    if single:
+        fields = ['%8d' % node for node in single]
+        file.write(head + ''.join(fields[:6]) + '\n')
+        for start in range(6, len(fields), 8):
+            file.write('        ' + ''.join(fields[start:start + 8]) + '\n')
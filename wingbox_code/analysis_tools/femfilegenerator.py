@@ -7,38 +7,30 @@ from parapy.mesh.salome import Mesh, Tri
 from parapy.cae.nastran import read_pch
 from .get_forces import GetForces
 from .generalfuse import GeneralFuse
+from .node_locator import NodeLocator, nodes_in_box, nodes_on_plane, nodes_on_segment
+from .mesh_cache import mesh_key, mesh_path, read_mesh, write_mesh
+from .bdf_stream import (mesh_arrays, render_writer, write_deck, write_elements, write_grids, write_mat1,
+                         write_pshell, write_spc1)
+from ..geometry.geometry_tools.shape_cache import CachedShape, brep_path
+from ..input_data.materials_catalog import get_catalog
 import numpy as np
-import csv
 import os
 
 
+SPC_SID = 1  # SPC set of the boundary conditions, shared by all subcases
+MESH_GROUPS = ['root_rib', 'front_spar', 'rear_spar']  # Node sets stored along with the cached mesh
+
+# Output requests of every subcase, unless set per subcase through FEMFileGenerator.output_requests
+DEFAULT_OUTPUTS = ['DISP = ALL',
+                   'DISPLACEMENT(SORT1,REAL,PUNCH)=ALL',
+                   'SPCFORCES(SORT1,REAL)=ALL',
+                   'STRESS(SORT1,REAL,VONMISES,BILIN,PUNCH)=ALL',
+                   'STRAIN(SORT1,REAL,VONMISES,BILIN,PUNCH)=ALL']
+
+
 # Function to find the mechanical properties of a material given a characteristic string.
 def mat_props_finder(mat_str: str):
-    cvs_units = [6.894757e6, 6.894757e6, 6.894757e6, 1, 515.378818, 6.894757e6, 6.894757e6, 6.894757e6]
-
-    # Finding characteristic parameters of input material.
-    split_mat_str = mat_str.split('-')
-    t = float(split_mat_str[2]) / 25.4  # Conversion to imperial units
-    split_mat_str.pop(2)
-    id = '-'.join(split_mat_str)
-
-    # Finding the correct mechanical properties.
-    path = 'wingbox_code/input_data/materials.csv'
-    with open(path, 'r', newline='') as file:
-        mat_file = csv.reader(file)
-        for idx, row in enumerate(mat_file):
-            if idx == 0:
-                header = row[6:len(row) - 1]
-                header.append('t')
-            else:
-                row_str = row[1] + '-' + row[2] + '-' + row[5]
-                t_m, t_p = float(row[3]), float(row[4])
-                if id == row_str and t_m < t < t_p:
-                    prop_lst = [float(row[k]) * cvs_units[k - 6] for k in range(6, len(row) - 1)]
-                    prop_lst.append(t)
-                    prop_dict = {key: value for (key, value) in zip(header, prop_lst)}
-
-                    return prop_dict
+    return get_catalog().props(mat_str)
 
 
 # Function to find cross-section properties for 1D elements.
@@ -64,12 +56,6 @@ def sec_props_finder(arg):
     return props_lst
 
 
-def pt_finder(obj, pt, tol):
-    while not obj.mesh.grid.find_node_at(pt, tolerance=tol):
-        tol *= 10
-    return obj.mesh.grid.find_node_at(pt, tolerance=tol)
-
-
 class FEMFileGenerator(GeomBase):
     wing = Input()
     analysis = Input()
@@ -92,6 +78,17 @@ class FEMFileGenerator(GeomBase):
     min_elem_size = Input(0.01)
     max_elem_size = Input(0.1)
 
+    # Force and BC points further than this from their nearest node are reported
+    @Input
+    def max_snap_distance(self):
+        return self.max_elem_size
+
+    # Distance within which nodes belong to a node set, as the fuzzy value of the fuse
+    node_set_tolerance = Input(1e-3)
+
+    # Case control output requests: one list for all subcases, or one list per subcase
+    output_requests = Input(DEFAULT_OUTPUTS)
+
     # Same material is used throughout all elements of a component.
     @Input
     def mat_props(self):
@@ -114,9 +111,51 @@ class FEMFileGenerator(GeomBase):
                          flight_cond=self.analysis.flight_cond)
 
     # Creation of parts for FEM mesh.
+    @Attribute
+    def section_groups(self):
+        """ Components spanning the whole wing (skin and spars), and the section key and components of each
+        trapezoid section with more than one component """
+        whole_wing = []
+        section_nodes = {}
+        for node, section in zip(self.wing.STEP_node_list, self.wing.node_sections):
+            if section is None:
+                whole_wing.append(node)
+            else:
+                section_nodes.setdefault(section, []).append(node)
+
+        groups = []
+        for section, nodes in sorted(section_nodes.items()):
+            if len(nodes) < 2:
+                whole_wing.extend(nodes)
+            else:
+                groups.append((self.wing.section_keys[section], nodes))
+        return whole_wing, groups
+
+    @Part
+    def section_fuse_in(self):
+        return GeneralFuse(quantify=len(self.section_groups[1]),
+                           tools=self.section_groups[1][child.index][1],
+                           fuzzy_value=1e-3,
+                           hidden=True)
+
+    @Part
+    def section_fuses(self):
+        """ Ribs and stringers of each trapezoid section fused together. Kept in the shape cache per section key,
+        so changing one section only re-fuses that section. """
+        return CachedShape(quantify=len(self.section_fuse_in),
+                           shape_in=self.section_fuse_in[child.index],
+                           filename=(brep_path(self.section_groups[1][child.index][0], 'section_fuse')
+                                     if self.wing.shape_cache else None),
+                           hidden=True)
+
+    @Attribute
+    def fuse_tools(self):
+        """ Skin and spars, and the ribs and stringers of each trapezoid section pre-fused per section """
+        return self.section_groups[0] + [fuse for fuse in self.section_fuses]
+
     @Part
     def general_shape(self):
-        return GeneralFuse(tools=self.wing.STEP_node_list,
+        return GeneralFuse(tools=self.fuse_tools,
                            fuzzy_value=1e-3)
 
     @Part
@@ -132,102 +171,148 @@ class FEMFileGenerator(GeomBase):
         return Mesh(shape_to_mesh=self.general_shape,
                     controls=[self.mesh_seed])
 
+    @Attribute
+    def mesh_key(self):
+        return mesh_key(self.wing.shape_key, self.min_elem_size, self.max_elem_size, self.quad_dominance)
+
+    @Attribute
+    def mesh_arrays(self):
+        """ Node coordinates, element connectivity and component node sets of the mesh as arrays. With the shape
+        cache on, they are read from the mesh cache and the mesh is only generated when the wingbox or the mesh
+        controls changed. """
+        path = mesh_path(self.mesh_key)
+        if self.wing.shape_cache and os.path.exists(path):
+            arrays = read_mesh(path)
+            if arrays['set_tolerance'] == self.node_set_tolerance:
+                return arrays
+            arrays['sets'] = self.component_sets(arrays)
+        else:
+            arrays = mesh_arrays(self.mesh.grid)
+            arrays['sets'] = self.component_sets(arrays)
+
+        arrays['set_tolerance'] = self.node_set_tolerance
+        if self.wing.shape_cache:
+            write_mesh(path, arrays)
+        return arrays
+
     # NASTRAN file writing.
+    def write_mesh_cards(self, file):
+        """
+        Streams the material, property, GRID and shell element cards of the mesh to an open .bdf file. All shell
+        elements use the skin material and thickness.
+        :param file: open file, positioned in the bulk data
+        :return: None
+        """
+        mat = self.mat_props[0]
+        write_mat1(file, 1, mat['E' + self.tc_select], mat['nu'], mat['rho'])
+        write_pshell(file, 1, 1, mat['t'])
+
+        arrays = self.mesh_arrays
+        write_grids(file, arrays['node_ids'], arrays['coords'])
+        for card in ['CTRIA3', 'CQUAD4']:
+            write_elements(file, card, *arrays[card], pid=1)
+
+    # Node sets, as sorted arrays of node ids.
+    def component_set(self, component, arrays):
+        """
+        Nodes of a structural component, selected from the mesh arrays
+        :param component: 'root_rib' (all nodes of the root rib), 'front_spar' or 'rear_spar' (nodes on the root
+        edge of the spar web)
+        :param arrays: mesh arrays, with node ids and coordinates
+        :return: sorted node ids
+        """
+        tol = self.node_set_tolerance
+        if component == 'root_rib':
+            bbox = self.wing.ribs.ribs[0].bbox
+            return nodes_in_box(arrays['node_ids'], arrays['coords'],
+                                (bbox.xmin - tol, bbox.ymin - tol, bbox.zmin - tol),
+                                (bbox.xmax + tol, bbox.ymax + tol, bbox.zmax + tol))
+
+        if component in ('front_spar', 'rear_spar'):
+            curve = self.wing.spars.spars[0 if component == 'front_spar' else 1].cutter_intersec_curves[0]
+            return nodes_on_segment(arrays['node_ids'], arrays['coords'],
+                                    curve.control_points[0], curve.control_points[-1], tol)
+
+        raise ValueError('Unknown component {}'.format(component))
+
+    def component_sets(self, arrays):
+        return {component: self.component_set(component, arrays) for component in MESH_GROUPS}
+
+    def node_set_box(self, lower, upper):
+        """ Nodes inside an axis-aligned box, given by its (x, y, z) lower and upper corners """
+        return nodes_in_box(self.mesh_arrays['node_ids'], self.mesh_arrays['coords'], lower, upper)
+
+    def node_set_plane(self, point, normal, tol=None):
+        """ Nodes within tol (node_set_tolerance if None) of a plane """
+        tol = self.node_set_tolerance if tol is None else tol
+        return nodes_on_plane(self.mesh_arrays['node_ids'], self.mesh_arrays['coords'], point, normal, tol)
+
+    def node_set_segment(self, start, end, tol=None):
+        """ Nodes within tol (node_set_tolerance if None) of a line segment, e.g. the edge of a spar web """
+        tol = self.node_set_tolerance if tol is None else tol
+        return nodes_on_segment(self.mesh_arrays['node_ids'], self.mesh_arrays['coords'], start, end, tol)
+
+    def node_set(self, component):
+        """
+        Nodes of a structural component, taken from the mesh cache when available
+        :param component: see component_set
+        :return: sorted node ids
+        """
+        sets = self.mesh_arrays['sets']
+        return sets[component] if component in sets else self.component_set(component, self.mesh_arrays)
+
     @Attribute
-    def FEMentries(self):
-        entries = []
+    def bc_sets(self):
+        """ Constrained node set of each boundary condition, with its constrained components """
+        return [(self.node_set(bc[0]), bc[1]) for bc in self.bcs]
 
-        # Defining materials to be used.
-        mat_2d = [[MAT1(E=mat['E' + self.tc_select], NU=mat['nu'], RHO=mat['rho']), mat['t']] for idx, mat in
-                  enumerate(self.mat_props) if idx <= 2]
-        mat_1d = [MAT1(E=mat['E' + self.tc_select], NU=mat['nu']) for idx, mat in enumerate(self.mat_props) if idx > 2]
-
-
-        # Defining element properties.
-        props_1d = [PBAR(MID=mat, A=props[0], I1=props[1], I2=props[2], J=props[3]) for
-                    mat, props in zip(mat_1d, sec_props_finder(self.secs))]
-        props_2d = [PSHELL(MID1=mat[0], T=mat[1], MID2=mat[0], MID3=mat[0]) for mat in mat_2d]
-
-
-        # Creating grid for the FEM model.
-        mesh_id_to_GRID = {}
-        for node in self.mesh.grid.nodes:
-            grid = GRID(ID=node.mesh_id, X1=node.x, X2=node.y, X3=node.z)
-            mesh_id_to_GRID[node.mesh_id] = grid
-            entries.append(grid)
-
-
-        # Appending the finite elements to be used in the model.
-        elms = []
-        for idx, face in enumerate(self.mesh.grid.faces):
-            nodes = [mesh_id_to_GRID[node.mesh_id] for node in face.nodes]
-            if len(nodes) == 3:
-                elm = CTRIA3(PID=props_2d[0], G1=nodes[0], G2=nodes[1], G3=nodes[2])
-                elms.append(elm)
-            elif len(nodes) == 4:
-                elm = CQUAD4(PID=props_2d[0], G1=nodes[0], G2=nodes[1], G3=nodes[2], G4=nodes[3])
-                elms.append(elm)
-        entries.extend(elms)
-
-
-        # BCs placement for front and rear spars and root rib.
-        bc_lst, bc_const = [], []
-        # If constraining root rib.
-        for bc in self.bcs:
-            if bc[0] == 'root_rib':
-                tol = 1e-7
-                # Getting all the points in the root rib.
-                obj = self.general_shape.vertices
-                pts = [obj[k].point for k in range(len(obj)) if obj[k].point[1] < 1e-6]
-
-                # Popping last skin vertices values.
-                x_coords = [pt[0] for pt in pts]
-                pts.pop(x_coords.index(max(x_coords)))
-                x_coords.pop(x_coords.index(max(x_coords)))
-                pts.pop(x_coords.index(max(x_coords)))
-
-                bc_lst_aux = [pt_finder(self, pt, tol).mesh_id for pt in pts]
-                bc_const_aux = [bc[1]] * len(bc_lst_aux)
-                bc_lst.extend(bc_lst_aux)
-                bc_const.extend(bc_const_aux)
-
-            elif bc[0] == 'front_spar':
-                tol = 1e-7
-                bc_lst_aux = [
-                    pt_finder(self, self.wing.spars.spars[0].cutter_intersec_curves[0].control_points[0], tol).mesh_id,
-                    pt_finder(self, self.wing.spars.spars[0].cutter_intersec_curves[0].control_points[1], tol).mesh_id]
-                bc_const_aux = [bc[1]] * len(bc_lst_aux)
-                bc_lst.extend(bc_lst_aux)
-                bc_const.extend(bc_const_aux)
-
-            elif bc[0] == 'rear_spar':
-                tol = 1e-7
-                bc_lst_aux = [
-                    pt_finder(self, self.wing.spars.spars[1].cutter_intersec_curves[0].control_points[0], tol).mesh_id,
-                    pt_finder(self, self.wing.spars.spars[1].cutter_intersec_curves[0].control_points[1], tol).mesh_id]
-                bc_const_aux = [bc[1]] * len(bc_lst_aux)
-                bc_lst.extend(bc_lst_aux)
-                bc_const.extend(bc_const_aux)
-
-        for SID in range(len(self.cases)):
-            spc1 = [SPC1(SID=SID+1, C=bc_const[idx], Gi=bc_lst[idx]) for idx, _ in enumerate(bc_lst)]
-            entries.extend(spc1)
+    @Attribute
+    def node_locator(self):
+        return NodeLocator(self.mesh_arrays['node_ids'], self.mesh_arrays['coords'])
 
+    @Attribute
+    def node_snaps(self):
+        """ Nodes of the load points of every case, found in a single nearest-node query. Points that snap further
+        than max_snap_distance are reported. """
+        load_points = [load_case.forces_moms_pos for load_case in self.cases]
+        points = [pt for pos in load_points for pt in pos]
+
+        node_ids, distances, far = self.node_locator.snap(points, self.max_snap_distance)
+        for idx in np.flatnonzero(far):
+            print('Point {} snapped to node {} at {:.3g} m, further than {:.3g} m'.format(
+                tuple(points[idx]), node_ids[idx], distances[idx], self.max_snap_distance))
+
+        node_ids = node_ids.tolist()
+        loads = []
+        start = 0
+        for pos in load_points:
+            loads.append(node_ids[start:start + len(pos)])
+            start += len(pos)
+
+        return {'loads': loads, 'distances': distances, 'far': far}
+
+    def write_spc_cards(self, file):
+        """ Streams the boundary conditions as SPC1 cards of the single SPC set shared by all subcases """
+        for node_ids, components in self.bc_sets:
+            write_spc1(file, SPC_SID, components, node_ids)
+
+    def write_bulk_cards(self, file):
+        self.write_mesh_cards(file)
+        self.write_spc_cards(file)
+
+    @Attribute
+    def FEMentries(self):
+        """ Load entries. The mesh and boundary condition cards are streamed separately, see write_bulk_cards. """
+        entries = []
 
         # Defining forces and their locations for each case.
         forces = []
         load_cases = self.cases
         for idx_SID, load_case in enumerate(load_cases):
-            idx_load = 0
             p_lst = []
             forces_moms = load_case.forces_moms
-            pos = load_case.forces_moms_pos
-
-            for point in pos:
-                tol = 1e-7
-                pt = pt_finder(self, point, tol)
-                force_id = pt.mesh_id
 
+            for idx_load, force_id in enumerate(self.node_snaps['loads'][idx_SID]):
                 # Calculate force and append it to list.
                 L_load = FORCE(SID=idx_SID+1, G=force_id, F=forces_moms[idx_load][0], N1=0, N2=0, N3=1)
                 D_load = FORCE(SID=idx_SID+1, G=force_id, F=forces_moms[idx_load][1], N1=1, N2=0, N3=0)
@@ -235,18 +320,36 @@ class FEMFileGenerator(GeomBase):
                 load_lst = [L_load, D_load, M_load]
                 p_lst.extend(load_lst)
 
-                idx_load += 1
-
             forces.extend(p_lst)
 
         entries.extend(forces)
 
         return entries
 
+    @Attribute
+    def subcases(self):
+        """ Subcases of the case control, rendered by the template: one per load case, all sharing the SPC set """
+        per_subcase = bool(self.output_requests) and not isinstance(self.output_requests[0], str)
+        return [{'id': idx + 1,
+                 'load': idx + 1,
+                 'spc': SPC_SID,
+                 'outputs': self.output_requests[idx] if per_subcase else self.output_requests}
+                for idx in range(len(self.cases))]
+
     @Attribute
     def FEMWriter(self):
         current_dir = os.path.dirname(os.path.abspath(__file__))
         template_path = os.path.join(current_dir, '..', 'bdf_files', 'bdf_templates', 'wingbox_template.bdf')
         return Writer(self.FEMentries,
                       template_path=template_path,
-                      template_values={'SID': [idx + 1 for idx, _ in enumerate(self.cases)]})
+                      template_values={'SID': [idx + 1 for idx, _ in enumerate(self.cases)],
+                                       'subcases': self.subcases})
+
+    def write_bdf(self, file_path):
+        """
+        Writes the .bdf file in a single pass: executive, case control and the load entries rendered from the
+        template, then the mesh and the boundary conditions streamed into the bulk data.
+        :param file_path: path to the .bdf file
+        :return: None
+        """
+        write_deck(file_path, render_writer(self.FEMWriter), self.write_bulk_cards)
@@ -32,44 +32,20 @@ class GetForces(Base):
     @Attribute
     def forces_moms_pos(self):
 
-        spar_interp_pts = []
-        x_poly_coeffs = []
-        z_poly_coeffs = []
         y_pos = self.data_treatment[0]
         spar_curves = self.input_case.wing.wingbox.spars.spars[0].cutter_intersec_curves
-        spans = self.input_case.wing.spans
+        index = self.input_case.wing.span_index
 
-        # Defining control points to be used in the interpolation.
-        ctrl_pts = []
-        for spar_curve in spar_curves:
-            control_pt = spar_curve.control_points[0]
-            if float(round(control_pt[1])) in spans:
-                ctrl_pts.append(control_pt)
+        # Defining control points to be used in the interpolation: the spar at the span stations.
+        ctrl_pts = np.array([spar_curve.control_points[0] for spar_curve in spar_curves])
+        ctrl_pts = ctrl_pts[index.is_span_station(ctrl_pts[:, 1])]
 
-        for k in range(len(ctrl_pts) - 1):
-            first_pt = ctrl_pts[k]
-            second_pt = ctrl_pts[k + 1]
+        # Finding AVL force locations along the spar by interpolation within their section.
+        idx, weight = index.section(y_pos)
+        x_interp = (1 - weight) * ctrl_pts[idx, 0] + weight * ctrl_pts[idx + 1, 0]
+        z_interp = (1 - weight) * ctrl_pts[idx, 2] + weight * ctrl_pts[idx + 1, 2]
 
-            # Getting the points to fit the polynomial.
-            x_pts = np.array([first_pt[0], second_pt[0]])
-            y_pts = np.array([first_pt[1], second_pt[1]])
-            z_pts = np.array([first_pt[2], second_pt[2]])
-
-            x_poly_coeffs.append(np.polyfit(y_pts, x_pts, 1).tolist())
-            z_poly_coeffs.append(np.polyfit(y_pts, z_pts, 1).tolist())
-
-        # Finding AVL force locations along the spar by interpolation.
-        interp_idx = 0
-        for y in y_pos:
-            if y > spans[interp_idx + 1]:
-                interp_idx += 1
-
-            x_interp = x_poly_coeffs[interp_idx][0] * y + x_poly_coeffs[interp_idx][1]
-            z_interp = z_poly_coeffs[interp_idx][0] * y + z_poly_coeffs[interp_idx][1]
-
-            spar_interp_pts.append((float(x_interp), y, float(z_interp)))
-
-        return spar_interp_pts
+        return [(float(x), y, float(z)) for x, y, z in zip(x_interp, y_pos, z_interp)]
 
     # Getting forces and moments.
     @Attribute
@@ -0,0 +1,54 @@
+"""
+On-disk cache of the FEM mesh. Nodes, element connectivity and the node sets of the structural components are
+stored as arrays in a compressed .npz file, keyed by the wingbox geometry and the mesh controls.
+"""
+import os
+import numpy as np
+from ..geometry.geometry_tools.shape_cache import SHAPE_CACHE_DIR, geometry_hash, prepare_entry, touch_entry
+
+
+MESH_CACHE_VERSION = 2
+ELEMENT_CARDS = ['CTRIA3', 'CQUAD4']
+SET_PREFIX = 'nodeset_'  # Keys of the node sets in the .npz file, apart from 'set_tolerance'
+
+
+def mesh_key(shape_key, min_elem_size, max_elem_size, quad_dominance):
+    """
+    Key of a mesh: the hash of the wingbox shapes (WingBox.shape_key) and the mesh controls
+    :return: hex digest
+    """
+    return geometry_hash({'wingbox': shape_key, 'min_elem_size': min_elem_size, 'max_elem_size': max_elem_size,
+                          'quad_dominance': quad_dominance, 'mesh_version': MESH_CACHE_VERSION})
+
+
+def mesh_path(key, cache_dir=SHAPE_CACHE_DIR):
+    return os.path.join(cache_dir, key, 'mesh.npz')
+
+
+def read_mesh(path):
+    """ Reads mesh arrays in the layout of bdf_stream.mesh_arrays, with the node sets under 'sets' and the tolerance
+    they were selected with under 'set_tolerance' """
+    touch_entry(path)
+    with np.load(path) as data:
+        arrays = {'node_ids': data['node_ids'], 'coords': data['coords'],
+                  'set_tolerance': float(data['set_tolerance']), 'sets': {}}
+        for card in ELEMENT_CARDS:
+            arrays[card] = (data[card + '_ids'], data[card + '_nodes'])
+        for name in data.files:
+            if name.startswith(SET_PREFIX):
+                arrays['sets'][name[len(SET_PREFIX):]] = data[name]
+    return arrays
+
+
+def write_mesh(path, arrays):
+    """ Writes mesh arrays to a .npz file. The file only appears once it is complete. """
+    data = {'node_ids': arrays['node_ids'], 'coords': arrays['coords'], 'set_tolerance': arrays['set_tolerance']}
+    for card in ELEMENT_CARDS:
+        data[card + '_ids'], data[card + '_nodes'] = arrays[card]
+    for name, node_ids in arrays['sets'].items():
+        data[SET_PREFIX + name] = node_ids
+
+    prepare_entry(path)
+    tmp_path = path + '.{}.tmp.npz'.format(os.getpid())
+    np.savez_compressed(tmp_path, **data)
+    os.replace(tmp_path, path)
@@ -0,0 +1,48 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class NodeLocator:
+    """
+    Spatial index over the nodes of a mesh. Points are snapped to their nearest node in a single batched query.
+    """
+
+    def __init__(self, node_ids, coords):
+        self.node_ids = np.asarray(node_ids)
+        self.tree = cKDTree(np.asarray(coords, dtype=float))
+
+    def snap(self, points, max_distance=None):
+        """
+        Nearest node of each point
+        :param points: sequence of (x, y, z)
+        :param max_distance: snap distance above which a point is flagged
+        :return: node ids, snap distances, flags of the points that snapped further than max_distance
+        """
+        points = np.array([list(pt) for pt in points], dtype=float).reshape(-1, 3)
+        distances, idx = self.tree.query(points)
+        far = (np.zeros(len(points), dtype=bool) if max_distance is None
+               else distances > max_distance)
+        return self.node_ids[idx], distances, far
+
+
+def nodes_in_box(node_ids, coords, lower, upper):
+    """ Sorted ids of the nodes inside an axis-aligned box, given by its (x, y, z) lower and upper corners """
+    inside = np.all((coords >= np.asarray(lower, dtype=float)) & (coords <= np.asarray(upper, dtype=float)), axis=1)
+    return np.sort(node_ids[inside])
+
+
+def nodes_on_plane(node_ids, coords, point, normal, tol):
+    """ Sorted ids of the nodes within tol of the plane through point with the given normal """
+    normal = np.asarray(normal, dtype=float) / np.linalg.norm(normal)
+    distance = np.abs((coords - np.asarray(point, dtype=float)) @ normal)
+    return np.sort(node_ids[distance <= tol])
+
+
+def nodes_on_segment(node_ids, coords, start, end, tol):
+    """ Sorted ids of the nodes within tol of the line segment between start and end """
+    start, end = np.asarray(list(start), dtype=float), np.asarray(list(end), dtype=float)
+    direction = end - start
+    rel = coords - start
+    t = np.clip(rel @ direction / (direction @ direction), 0, 1)
+    distance = np.linalg.norm(rel - t[:, np.newaxis] * direction, axis=1)
+    return np.sort(node_ids[distance <= tol])
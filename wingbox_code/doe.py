@@ -0,0 +1,234 @@
+"""
+Design of experiments over WingBoxAssessment variants, evaluated in a process pool.
+
+    python -m wingbox_code.doe doe_spec.json
+
+The spec is a JSON file such as
+    {"inputs": "wingbox_user_inputs.xlsx",
+     "grid": {"rib_idx": [[7, 5, 3], [9, 6, 4]], "mat_2D": [[...], [...]]},
+     "stages": ["geometry", "wingbox", "mesh"],
+     "workers": 4,
+     "output": "doe_runs"}
+or, for a Latin hypercube, "lhs": {"front_spar_loc": [[0.15, 0.15, 0.15, 0.15], [0.25, 0.25, 0.25, 0.25]]}
+together with "samples" and an optional "seed".
+"""
+import argparse
+import copy
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .runner import STAGES, load_run_inputs, run_stages
+
+
+# Folders that the model writes to, relative to the working directory.
+WORK_DIRS = [os.path.join('wingbox_code', 'bdf_files'),
+             os.path.join('wingbox_code', 'output_data', 'avl_plots'),
+             os.path.join('wingbox_code', 'output_data', 'raw_NASTRAN_output'),
+             os.path.join('wingbox_code', 'output_data', 'categorized_outputs', 'reactions'),
+             os.path.join('wingbox_code', 'output_data', 'categorized_outputs', 'displacements'),
+             os.path.join('wingbox_code', 'output_data', 'categorized_outputs', 'stresses'),
+             os.path.join('wingbox_code', 'output_data', 'categorized_outputs', 'strains')]
+
+
+def grid_variants(grid):
+    """
+    Full factorial combination of input values.
+    :param grid: dict of input name -> list of candidate values
+    :return: list of dicts of input overrides
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*[grid[name] for name in names])]
+
+
+def latin_hypercube(n_samples, n_dims, seed=None):
+    """ Latin hypercube sample in the unit cube, one stratum per sample along every dimension. """
+    rng = np.random.default_rng(seed)
+    sample = (rng.random((n_samples, n_dims)) + np.arange(n_samples)[:, np.newaxis]) / n_samples
+    for k in range(n_dims):
+        sample[:, k] = sample[rng.permutation(n_samples), k]
+    return sample
+
+
+def lhs_variants(bounds, n_samples, seed=None):
+    """
+    Latin hypercube sample of numeric inputs. The bounds of an input are either two numbers or two (nested) lists
+    of the same shape, in which case every element is a separate dimension. Inputs whose bounds are all integers
+    are rounded, so counts such as rib_idx or stringer_idx stay integers.
+    :param bounds: dict of input name -> [lower, upper]
+    :param n_samples: number of variants
+    :param seed: random seed
+    :return: list of dicts of input overrides
+    """
+    names = list(bounds)
+    lower = [np.asarray(bounds[name][0]) for name in names]
+    upper = [np.asarray(bounds[name][1]) for name in names]
+    sizes = [low.size for low in lower]
+    sample = latin_hypercube(n_samples, sum(sizes), seed)
+
+    variants = [{} for _ in range(n_samples)]
+    start = 0
+    for name, low, high, size in zip(names, lower, upper, sizes):
+        values = low.ravel() + sample[:, start:start + size] * (high.ravel() - low.ravel())
+        if low.dtype.kind in 'iu' and high.dtype.kind in 'iu':
+            values = np.rint(values).astype(int)
+        for variant, row in zip(variants, values):
+            value = row.reshape(low.shape).tolist()
+            variant[name] = value
+        start += size
+
+    return variants
+
+
+def max_displacements(punch_path):
+    """ Largest translation magnitude of every subcase in a punch file. """
+    from .output_tools.punch_interpreter import read_punch
+    disp_dict, _, _ = read_punch(punch_path)
+
+    results = {}
+    for subcase, rows in disp_dict.items():
+        u = np.array([[float(value) for value in row[1:4]] for row in rows])
+        results['max_disp_{}'.format(subcase)] = float(np.max(np.linalg.norm(u, axis=1)))
+    return results
+
+
+def run_variant(index, inputs, stages, work_root):
+    """
+    Evaluates one variant in its own working directory. Runs in a worker process.
+    :param index: variant number
+    :param inputs: complete dict of WingBoxAssessment inputs
+    :param stages: list of stage names
+    :param work_root: folder holding the working directories of all variants
+    :return: dict with one value per table column
+    """
+    work_dir = os.path.abspath(os.path.join(work_root, 'variant_{:04d}'.format(index)))
+    for folder in WORK_DIRS:
+        os.makedirs(os.path.join(work_dir, folder), exist_ok=True)
+
+    inputs = copy.deepcopy(inputs)
+    inputs['bdf_file_folder'] = os.path.join(work_dir, 'wingbox_code', 'bdf_files')
+
+    row = {'variant': index, 'work_dir': work_dir, 'error': None}
+    start = time.perf_counter()
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        model, results, timings = run_stages(inputs, stages, verbose=False)
+        for stage, timing in timings.items():
+            row['t_' + stage] = timing
+
+        if 'wingbox' in results:
+            row['mass'] = model.structural_mass
+        if 'mesh' in results:
+            row['nodes'] = results['mesh']['nodes']
+            row['elements'] = results['mesh']['elements']
+
+        for punch_path in [os.path.join(work_dir, 'wingbox_code', 'output_data', 'raw_NASTRAN_output',
+                                        'wingbox_bulkdata.pch'),
+                           os.path.join(work_dir, 'wingbox_bulkdata.pch')]:
+            if os.path.isfile(punch_path):
+                row.update(max_displacements(punch_path))
+                break
+    except Exception as error:
+        row['error'] = '{}: {}'.format(type(error).__name__, error)
+        traceback.print_exc()
+    finally:
+        os.chdir(cwd)
+
+    row['t_variant'] = time.perf_counter() - start
+    return row
+
+
+def to_columns(rows):
+    """ Turns a list of row dicts into a dict of columns, filling missing values with None. """
+    names = []
+    for row in rows:
+        names.extend(name for name in row if name not in names)
+    return {name: [row.get(name) for row in rows] for name in names}
+
+
+def run_doe(base_inputs, variants, stages=('geometry', 'wingbox', 'mesh'), workers=None, work_root='doe_runs'):
+    """
+    Evaluates WingBoxAssessment variants in a process pool. On Windows, call it from a
+    'if __name__ == "__main__":' block.
+    :param base_inputs: dict of WingBoxAssessment inputs shared by all variants
+    :param variants: list of dicts of input overrides, see grid_variants and lhs_variants
+    :param stages: stages evaluated for every variant, see runner.STAGES
+    :param workers: number of worker processes, defaults to the number of CPUs
+    :param work_root: folder for the working directories of the variants
+    :return: columnar table, dict of column name -> list of values
+    """
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        raise ValueError('Unknown stages {}. Choose between {}.'.format(unknown, STAGES))
+
+    runs = []
+    for variant in variants:
+        inputs = dict(base_inputs)
+        inputs.update(variant)
+        runs.append(inputs)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_variant, index, inputs, list(stages), work_root)
+                   for index, inputs in enumerate(runs)]
+        rows = [future.result() for future in futures]
+
+    for row, variant in zip(rows, variants):
+        for name, value in variant.items():
+            row[name] = value
+
+    return to_columns(rows)
+
+
+def write_table(table, path):
+    """ Writes a columnar table to a .csv file. List values are written as JSON. """
+    names = list(table)
+    n_rows = len(table[names[0]]) if names else 0
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(names)
+        for i in range(n_rows):
+            values = [table[name][i] for name in names]
+            writer.writerow(['' if value is None else json.dumps(value) if isinstance(value, (list, dict))
+                             else value for value in values])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m wingbox_code.doe',
+                                     description='Runs a design of experiments over wingbox variants.')
+    parser.add_argument('spec', help='DOE specification (.json)')
+    args = parser.parse_args(argv)
+
+    with open(args.spec, 'r') as file:
+        spec = json.load(file)
+
+    base_inputs, input_warnings = load_run_inputs(spec['inputs'])
+    for header, msg in input_warnings:
+        print('{}: {}'.format(header, msg), file=sys.stderr)
+
+    if 'grid' in spec:
+        variants = grid_variants(spec['grid'])
+    elif 'lhs' in spec:
+        variants = lhs_variants(spec['lhs'], spec['samples'], spec.get('seed'))
+    else:
+        raise ValueError("The DOE specification needs either a 'grid' or an 'lhs' entry.")
+
+    work_root = spec.get('output', 'doe_runs')
+    os.makedirs(work_root, exist_ok=True)
+    table = run_doe(base_inputs, variants, spec.get('stages', ['geometry', 'wingbox', 'mesh']),
+                    spec.get('workers'), work_root)
+
+    table_path = os.path.join(work_root, 'doe_results.csv')
+    write_table(table, table_path)
+    n_failed = sum(error is not None for error in table['error'])
+    print('{} variants, {} failed. Results written to {}'.format(len(variants), n_failed, table_path))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
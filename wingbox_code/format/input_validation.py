@@ -0,0 +1,510 @@
+from functools import lru_cache
+from itertools import combinations
+import os
+from .tk_warn import type_warning
+from ..input_data.materials_catalog import get_catalog
+
+
+AIRFOIL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'input_data', 'airfoils')
+
+NUMBER = (int, float)
+
+# Every valid DOF string: non-repeated indexes between 1 and 6 in ascending order.
+DOF_MASKS = frozenset(''.join(dofs) for n in range(7) for dofs in combinations('123456', n))
+
+BC_LABELS = ['root_rib', 'front_spar', 'rear_spar']
+
+SECTION_MSG = ' If you want to add/remove sections, change n_sections.'
+AIRFOIL_MSG = ' If you want to add/remove sections, change n_airfoils'
+
+
+@lru_cache(maxsize=None)
+def _airfoil_index(folder, mtime):
+    return frozenset(name.split('.')[0] for name in os.listdir(folder))
+
+
+def airfoil_index(folder=AIRFOIL_DIR):
+    """ Names of the available airfoil files. The folder is only listed again when it changes. """
+    return _airfoil_index(folder, os.path.getmtime(folder))
+
+
+def _check_numbers(values, label):
+    for value in values:
+        warn, msg = type_warning(value, label, NUMBER)
+        if not warn:
+            return False, msg
+    return True
+
+
+def _check_angles(values, label, n):
+    if len(values) != n:
+        msg = 'The number of section {} must be coherent with the number of sections.'.format(label) + SECTION_MSG
+        return False, msg
+
+    for i in range(len(values)):
+        warn, msg = type_warning(values[i], label[:-1], NUMBER)
+        if not warn:
+            return False, msg
+        if values[i] < -85 or values[i] > 85:
+            msg = 'The {} value must be kept in the range [-85, 85] degrees. Change section {}'.format(label[:-1], i)
+            return False, msg
+
+    return True
+
+
+def check_spans(span, n_sections):
+    """
+    Validates whether the span inputs are positive, in ascending order, and not defined at the same position,
+    as well as correct type and number of inputs
+    """
+    if len(span) != n_sections + 1:
+        msg = 'The number of section spans must be coherent with the number of sections.' + SECTION_MSG
+        return False, msg
+
+    if 0 not in span:
+        msg = 'The "0" span station must be kept unchanged'
+        return False, msg
+
+    for i in range(1, len(span)):
+        warn, msg = type_warning(span[i], 'span', NUMBER)
+        if not warn:
+            return False, msg
+
+        if span[i] <= 0:
+            msg = 'The section spans cannot be negative or equal to zero. Change section {}'.format(i)
+            return False, msg
+        if span[i] == span[i - 1]:
+            msg = 'Two sections cannot be defined at the same span length. Change section {}'.format(i)
+            return False, msg
+        if span[i] < span[i - 1]:
+            msg = 'The sections must be organized in ascending order. Change section {}'.format(i)
+            return False, msg
+
+    return True
+
+
+def check_tapers(taper, n_sections):
+    """ Validates if the taper inputs are positive, and the correct type """
+    if len(taper) != n_sections + 1:
+        msg = 'The number of section tapers must be coherent with the number of sections.' + SECTION_MSG
+        return False, msg
+
+    for i in range(len(taper)):
+        warn, msg = type_warning(taper[i], 'taper', NUMBER)
+        if not warn:
+            return False, msg
+
+        if taper[i] <= 0:
+            msg = 'The section taper cannot be negative or equal to zero. Change section {}'.format(i)
+            return False, msg
+
+    return True
+
+
+def check_sweeps(sweep, n_sections):
+    """ Validates if the sweep inputs are within range, and the correct type """
+    return _check_angles(sweep, 'sweeps', n_sections)
+
+
+def check_dihedrals(dihedral, n_sections):
+    """ Validates if the dihedral inputs are within range, and the correct type """
+    return _check_angles(dihedral, 'dihedrals', n_sections)
+
+
+def check_twist(twists, n_sections):
+    """ Validates if the twist inputs are within range, and the correct type """
+    return _check_angles(twists, 'twists', n_sections + 1)
+
+
+def check_airfoil_sections(sections, n_airfoils):
+    """ Validates the airfoil section order, limits, and coherence. """
+    if len(sections) != n_airfoils:
+        msg = 'The number of airfoil locations must be coherent with the number of airfoils.' + AIRFOIL_MSG
+        return False, msg
+
+    if 0 not in sections or 1 not in sections:
+        msg = 'Either no tip or no root airfoil was input'
+        return False, msg
+
+    for i in range(1, len(sections)):
+        warn, msg = type_warning(sections[i], 'airfoil sections', NUMBER)
+        if not warn:
+            return False, msg
+        if sections[i] <= 0:
+            msg = 'The airfoil span sections cannot be negative or equal to zero.' \
+                  'Change airfoil location {}'.format(i)
+            return False, msg
+        if sections[i] == sections[i - 1]:
+            msg = 'Two airfoils cannot be defined at the same span length. Change airfoil location {}'.format(i)
+            return False, msg
+        if sections[i] < sections[i - 1]:
+            msg = 'The airfoils must be organized in ascending order. Change airfoil location {}'.format(i)
+            return False, msg
+        if sections[i] > 1 or sections[i] < 0:
+            msg = 'The airfoil location cannot be located outside of the span. Change airfoil location {}'.format(i)
+            return False, msg
+
+    return True
+
+
+def check_airfoil_names(names, n_airfoils):
+    """
+    Validates the airfoil name feasibility, either by searching in the airfoil folder or by using the
+    NACA 4/5 digit generator.
+    """
+    if len(names) != n_airfoils:
+        msg = 'The number of airfoil names must be coherent with the number of airfoils.' + AIRFOIL_MSG
+        return False, msg
+
+    name_database = airfoil_index()
+    for name in names:
+        warn, msg = type_warning(name, 'airfoil names', str)
+        if not warn:
+            return False, msg
+
+        if name not in name_database and not (len(name) == 4 or len(name) == 5):
+            msg = 'Invalid airfoil name. Make sure the name is correctly written or contains either 4 or 5 digits.'
+            return False, msg
+
+    return True
+
+
+def check_case_settings(cases, n_loads):
+    """ Validates the strict naming convention of the case_settings input, as well as its coherence. """
+    for i in cases:
+        if len(i) != n_loads:
+            msg = 'The number of load cases must be coherent.' \
+                  ' If you want to add/remove load cases, change n_loads'
+            return False, msg
+
+    for i in cases[0]:
+        warn, msg = type_warning(i, 'load case names', str)
+        if not warn:
+            return False, msg
+
+    for i in cases[1]:
+        if i != 'alpha' and i != 'CL':
+            msg = 'Invalid load case variable name. Please use either "alpha" or "CL"'
+            return False, msg
+
+    for i in cases[2]:
+        warn, msg = type_warning(i, 'load case variable value', NUMBER)
+        if not warn:
+            return False, msg
+
+    return True
+
+
+def check_rib_idx(ribs, n_sections):
+    """ Validates list coherence as well as that the elements are positive and integers """
+    if len(ribs) != n_sections:
+        msg = 'The number of section ribs must be coherent with the number of sections.' + SECTION_MSG
+        return False, msg
+
+    for rib in ribs:
+        warn, msg = type_warning(rib, 'rib number', int)
+        if not warn:
+            return False, msg
+
+        if rib <= 0:
+            msg = 'The amount of ribs must at least be 1 for every section'
+            return False, msg
+
+    return True
+
+
+def check_front_spar_loc(fs_locs, n_sections, rear_spar_loc):
+    """
+    It validates the location of the spars, its coherence, and makes sure that it stays within the chord
+    and does not cross over the rear spar.
+    """
+    if len(fs_locs) != n_sections + 1:
+        msg = 'The number of section front spar locations must be coherent with the number of sections.' \
+              + SECTION_MSG
+        return False, msg
+
+    for i in range(len(fs_locs)):
+        warn, msg = type_warning(fs_locs[i], 'front spar location', float)
+        if not warn:
+            return False, msg
+
+        if fs_locs[i] <= 0 or fs_locs[i] >= 1:
+            msg = 'Front spar locations must be limited between 0 and 1 to stay within the chord'
+            return False, msg
+
+        if i < len(rear_spar_loc) and fs_locs[i] >= rear_spar_loc[i]:
+            msg = 'The front spar cannot be further aft than the rear spar'
+            return False, msg
+
+    return True
+
+
+def check_rear_spar_loc(rs_locs, n_sections):
+    """ It validates the location of the spars, its coherence, and makes sure that it stays within the chord. """
+    if len(rs_locs) != n_sections + 1:
+        msg = 'The number of section rear spar locations must be coherent with the number of sections.' \
+              + SECTION_MSG
+        return False, msg
+
+    for i in range(len(rs_locs)):
+        warn, msg = type_warning(rs_locs[i], 'rear spar location', float)
+        if not warn:
+            return False, msg
+
+        if rs_locs[i] <= 0 or rs_locs[i] >= 1:
+            msg = 'Rear spar locations must be limited between 0 and 1 to stay within the chord'
+            return False, msg
+
+    return True
+
+
+def check_stringer_idx(stringers, n_sections):
+    """ Validates list coherence as well as that the elements are positive and integers """
+    if len(stringers) != n_sections:
+        msg = 'The number of section stringers must be coherent with the number of sections.' + SECTION_MSG
+        return False, msg
+
+    for section in stringers:
+        for num_stringer in section:
+            warn, msg = type_warning(num_stringer, 'stringer', int)
+            if not warn:
+                return False, msg
+        if len(section) != 2:
+            msg = 'Wrong number of inputs. The list must have two inputs per section: top and bottom stringers.'
+            return False, msg
+
+    return True
+
+
+def _check_te_gap(value, rear_spar_loc, label):
+    if value > 0.98:
+        msg = 'The {} cut location cannot be located more than 98% of the chord'.format(label)
+        return False, msg
+
+    if rear_spar_loc and value < max(rear_spar_loc):
+        msg = 'The {} cut location cannot be located further front than the aft spar.'.format(label)
+        return False, msg
+
+    return True
+
+
+def check_te_skin_gap(value, rear_spar_loc):
+    """ Verifies that the gap is kept further back than the rear spar """
+    return _check_te_gap(value, rear_spar_loc, 'skin')
+
+
+def check_te_ribs_gap(value, rear_spar_loc):
+    """ Verifies that the gap is kept further back than the rear spar """
+    return _check_te_gap(value, rear_spar_loc, 'rib')
+
+
+def check_materials(materials):
+    """ Validates that the name of the material will be accepted by the NASTRAN interface later on """
+    catalog = get_catalog()
+    for material in materials:
+        warn, msg = type_warning(material, 'material', str)
+        if not warn:
+            return False, msg
+
+        warn, msg = catalog.check(material)
+        if not warn:
+            return False, msg
+
+    return True
+
+
+def check_nastran_path(path):
+    """ Verifies if the NASTRAN path exists """
+    if not os.path.exists(path):
+        msg = 'NASTRAN folder/executable does not exist. Please install NASTRAN, or correct the folder path.'
+        return False, msg
+
+    return True
+
+
+def check_bdf_file_folder(path):
+    """ Verifies that the bdf file path exists """
+    if not os.path.isdir(path):
+        msg = 'Folder to save .bdf file does not exist. Please create this folder or correct the folder path.'
+        return False, msg
+
+    return True
+
+
+def check_min_elem_size(value, max_elem_size):
+    """ Verifies that the minimum element size is not larger than the maximum element size """
+    if value > max_elem_size:
+        msg = 'Minimum element size cannot be greater than the maximum element size.'
+        return False, msg
+
+    return True
+
+
+def check_tc_select(value):
+    """ Verifies the tension or compression selector """
+    if value not in ('t', 'c'):
+        msg = 'The tension or compression selector must be "t" or "c".'
+        return False, msg
+
+    return True
+
+
+def check_secs(cs_lst):
+    """ Verifies that the tight naming scheme of the cross-section input is respected """
+    if len(cs_lst) != 3:
+        msg = 'The number of cross-section descriptions cannot be changed.'
+        return False, msg
+
+    for values, label in cs_lst:
+        if label != 'moms' and label != 'dims':
+            msg = 'Cross-section descriptor must be "moms" or "dims".'
+            return False, msg
+
+        if label == 'moms' and len(values) != 4:
+            msg = 'Cross-section defined on moments of inertia must have four inputs:' \
+                  ' cross-sectional area, moment of inertia in the vertical axes, in the horizontal' \
+                  ' axes, and polar moment of inertia.'
+            return False, msg
+
+        if label == 'dims' and len(values) != 2:
+            msg = 'Cross-section defined on dimensions must have two inputs:' \
+                  ' vertical and horizontal lengths.'
+            return False, msg
+
+        warn = _check_numbers(values, 'cross-sectional dimensions')
+        if warn is not True:
+            return warn
+
+    return True
+
+
+def check_bcs(bcs_lst):
+    """
+    Verifies that the boundary condition input is correctly implemented: no repetition, limits, naming
+    scheme, etc.
+    """
+    if len(bcs_lst) != 3:
+        msg = 'The number of boundary condition descriptions cannot be changed.'
+        return False, msg
+
+    for i in range(3):
+        warn, msg = type_warning(bcs_lst[i][1], 'constricted DOFs', str)
+        if not warn:
+            return False, msg
+
+        if bcs_lst[i][0] != BC_LABELS[i]:
+            msg = 'Boundary condition descriptors cannot be changed.'
+            return False, msg
+
+        dof = bcs_lst[i][1]
+        if dof not in DOF_MASKS:
+            if len(dof) != len(set(dof)):
+                msg = 'DOF indexes cannot be repeated'
+            elif not set(dof) <= set('123456'):
+                msg = 'DOF index must be comprised between 1 and 6.'
+            else:
+                msg = 'DOF indexes must be ordered in ascending order.'
+            return False, msg
+
+    return True
+
+
+def check_output_requests(requests, case_settings):
+    """
+    Verifies that the NASTRAN output requests are either one list of requests for all subcases, or one list per
+    load case.
+    """
+    if all(isinstance(request, str) for request in requests):
+        return True
+
+    if not all(isinstance(request, list) for request in requests):
+        msg = 'Output requests must be a list of requests, or a list with one list of requests per load case.'
+        return False, msg
+
+    if len(requests) != len(case_settings[2]):
+        msg = 'There must be one list of output requests per load case.'
+        return False, msg
+
+    for subcase in requests:
+        for request in subcase:
+            warn, msg = type_warning(request, 'output requests', str)
+            if not warn:
+                return False, msg
+
+    return True
+
+
+def _check_type(value, label, type_i):
+    warn, msg = type_warning(value, label, type_i)
+    return True if warn else (False, msg)
+
+
+def _check_positive(value, label, type_i):
+    warn, msg = type_warning(value, label, type_i)
+    if not warn:
+        return False, msg
+    if value <= 0:
+        return False, 'The {} must be positive.'.format(label)
+    return True
+
+
+# Validation table: input name -> (check, names of the other inputs it depends on).
+CHECKS = {
+    'root_chord': (lambda v: _check_positive(v, 'root chord', NUMBER), []),
+    'n_sections': (lambda v: _check_positive(v, 'n_sections', int), []),
+    'n_airfoils': (lambda v: _check_positive(v, 'n_airfoils', int), []),
+    'n_loads': (lambda v: _check_positive(v, 'n_loads', int), []),
+    'weight': (lambda v: _check_positive(v, 'weight', NUMBER), []),
+    'speed': (lambda v: _check_positive(v, 'speed', NUMBER), []),
+    'height': (lambda v: _check_type(v, 'height', NUMBER), []),
+    'spans': (check_spans, ['n_sections']),
+    'tapers': (check_tapers, ['n_sections']),
+    'sweeps': (check_sweeps, ['n_sections']),
+    'dihedrals': (check_dihedrals, ['n_sections']),
+    'twist': (check_twist, ['n_sections']),
+    'airfoil_sections': (check_airfoil_sections, ['n_airfoils']),
+    'airfoil_names': (check_airfoil_names, ['n_airfoils']),
+    'case_settings': (check_case_settings, ['n_loads']),
+    'rib_idx': (check_rib_idx, ['n_sections']),
+    'front_spar_loc': (check_front_spar_loc, ['n_sections', 'rear_spar_loc']),
+    'rear_spar_loc': (check_rear_spar_loc, ['n_sections']),
+    'stringer_idx': (check_stringer_idx, ['n_sections']),
+    'TE_skin_gap': (check_te_skin_gap, ['rear_spar_loc']),
+    'TE_ribs_gap': (check_te_ribs_gap, ['rear_spar_loc']),
+    'mat_1D': (check_materials, []),
+    'mat_2D': (check_materials, []),
+    'nastran_path': (check_nastran_path, []),
+    'bdf_file_folder': (check_bdf_file_folder, []),
+    'min_elem_size': (check_min_elem_size, ['max_elem_size']),
+    'max_elem_size': (lambda v: _check_positive(v, 'maximum element size', NUMBER), []),
+    'tc_select': (check_tc_select, []),
+    'secs': (check_secs, []),
+    'bcs': (check_bcs, [])}
+
+
+def validate_inputs(inputs, skip=()):
+    """
+    Validates a complete input set in a single pass and collects every error.
+    :param inputs: dict of WingBoxAssessment inputs
+    :param skip: names of inputs not to validate (e.g. file paths on a compute node)
+    :return: list of (input name, message) errors, empty if the inputs are valid
+    """
+    errors = []
+    for label, (check, depends) in CHECKS.items():
+        if label in skip:
+            continue
+        if label not in inputs:
+            errors.append((label, 'Missing input.'))
+            continue
+
+        try:
+            result = check(inputs[label], *[inputs[name] for name in depends])
+        except KeyError:
+            continue  # the missing dependency is reported on its own
+        except (TypeError, ValueError, IndexError):
+            result = False, 'The input {} is ill-formed.'.format(label)
+
+        if result is not True:
+            errors.append((label, result[1]))
+
+    return errors
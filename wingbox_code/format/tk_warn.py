@@ -35,12 +35,15 @@ def type_warning(value, label, type_i):
 
     return True, None
 
+
 def material_validation():
     """
     Performs validation of the material name with the data from the datasheet.
     :return: list of valid names and thicknesses
     """
-    import csv
+    from ..input_data.materials_catalog import get_catalog
+
+    catalog = get_catalog()
 
     # List initialization
     names = []
@@ -49,22 +52,12 @@ def material_validation():
     partial_name = []
     thicknesses = []
 
-    # Finding the correct mechanical properties.
-    path = 'wingbox_code/input_data/materials.csv'
-    with open(path, 'r', newline='') as file:
-        mat_file = csv.reader(file)
-
-        for idx, row in enumerate(mat_file):
-            if idx != 0:
-                names.append(row[1])
-                temper.append(row[2])
-                basis.append(row[5])
-
-                row_str = row[1] + '-' + row[2] + '-' + row[5]
-                partial_name.append(row_str)
-
-                t_lims = [float(row[3]), float(row[4])]
-                thicknesses.append(t_lims)
+    for key, thickness_index in catalog.index.items():
+        for t_lims in thickness_index.limits:
+            names.append(key[0])
+            temper.append(key[1])
+            basis.append(key[2])
+            partial_name.append('-'.join(key))
+            thicknesses.append(list(t_lims))
 
     return names, temper, basis, partial_name, thicknesses
-
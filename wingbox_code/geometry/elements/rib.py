@@ -7,6 +7,7 @@ class Rib(GeomBase):
     rib_span = Input()
     skin_shell = Input()
     root_chord = Input()
+    island = Input(None)  # Section of the skin at rib_span, if already known
 
     @Part
     def cut_tool(self):
@@ -26,6 +27,5 @@ class Rib(GeomBase):
     @Part
     def rib_surf(self):
         return TrimmedSurface(built_from=self.cut_tool,
-                              island=self.rib_wire.edges[0],
-                              mesh_deflection=1e-4,
+                              island=self.rib_wire.edges[0] if self.island is None else self.island,
                               hidden=False)
@@ -1,11 +1,48 @@
 from parapy.core import *
 from parapy.geom import *
+from parapy.core.validate import OneOf
+import numpy as np
+
+
+def is_straight(points, tol=1e-6):
+    """
+    Checks whether the control points of a curve lie on the line between its end points
+    :param points: control points
+    :param tol: tolerance, as a fraction of the distance between the end points
+    :return: bool
+    """
+    pts = np.array([list(pt) for pt in points], dtype=float)
+    chord = pts[-1] - pts[0]
+    length = np.linalg.norm(chord)
+    if length == 0:
+        return False
+    offsets = np.cross(pts - pts[0], chord / length)
+    return bool(np.all(np.linalg.norm(offsets, axis=1) < tol * length))
 
 
 class Spar(GeomBase):
     curves = Input()
 
+    # 'auto' builds a ruled web between straight section cuts and falls back to a filling otherwise
+    web_mode = Input('auto', validator=OneOf(['auto', 'ruled', 'filled']))
+
+    @Attribute
+    def is_ruled(self):
+        if self.web_mode != 'auto':
+            return self.web_mode == 'ruled'
+        return all(is_straight(curve.control_points) for curve in self.curves)
+
+    @Attribute
+    def web_edges(self):
+        """ End points of both section cuts, with the second cut running in the same direction as the first """
+        (a0, a1), (b0, b1) = [(curve.start, curve.end) for curve in self.curves]
+        if (a1 - a0).dot(b1 - b0) < 0:
+            b0, b1 = b1, b0
+        return (a0, a1), (b0, b1)
+
     @Part
     def Spar(self):
-        return FilledSurface(curves=self.curves,
-                             mesh_deflection=1e-4)
+        if self.is_ruled:
+            return RuledSurface(curve1=LineSegment(*self.web_edges[0]),
+                                curve2=LineSegment(*self.web_edges[1]))
+        return FilledSurface(curves=self.curves)
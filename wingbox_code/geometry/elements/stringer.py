@@ -33,6 +33,11 @@ class Stringer(GeomBase):
     end = Input()
     wing = Input()
     up = Input()
+    sections = Input(None)  # Loft sections the stringer runs over, the whole wing if not given
+
+    @Attribute
+    def skin_sections(self):
+        return [self.wing.right_wing] if self.sections is None else self.sections
 
     @Part
     def stringer_lines(self):
@@ -50,10 +55,12 @@ class Stringer(GeomBase):
 
     @Part
     def stringer_intersect(self):
-        return IntersectedShapes(shape_in=self.wing.right_wing,
+        return IntersectedShapes(quantify=len(self.skin_sections),
+                                 shape_in=self.skin_sections[child.index],
                                  tool=self.stringer_plane,
                                  hidden=True)
 
     @Part
     def stringers(self):
-        return Wire(curves_in=stringer_finder(self.stringer_intersect.edges, self.up))
+        edges = [edge for cut in self.stringer_intersect for edge in cut.edges]
+        return Wire(curves_in=stringer_finder(edges, self.up))
@@ -35,5 +35,4 @@ class Airfoil(GeomBase, Base):
     def scaled_foil(self):
         return ScaledCurve(curve_in=self.rotated_foil,
                            reference_point=self.airfoil_start,
-                           factor=self.airfoil_chord,
-                           mesh_deflection=1e-4)
+                           factor=self.airfoil_chord)
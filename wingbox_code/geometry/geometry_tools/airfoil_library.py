@@ -0,0 +1,111 @@
+import hashlib
+import os
+import numpy as np
+import cst
+
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'input_data')
+AIRFOIL_DIR = os.path.join(INPUT_DIR, 'airfoils')
+CACHE_DIR = os.path.join(INPUT_DIR, 'airfoil_cache')
+
+CST_ORDER = 8
+LIBRARY_VERSION = 1
+
+# Entries already loaded in this process, by key.
+_entries = {}
+
+
+def is_naca(airfoil_name):
+    """ True if the name is a NACA 4 or 5 digit designation. """
+    return airfoil_name.isnumeric() and (len(airfoil_name) == 5 or len(airfoil_name) == 4)
+
+
+def dat_path(airfoil_name):
+    return os.path.join(AIRFOIL_DIR, airfoil_name + '.dat')
+
+
+def airfoil_key(airfoil_name):
+    """
+    Key of an airfoil in the library: its designation for NACA airfoils, the hash of the file contents for
+    Selig .dat files. The CST order and library version are part of the key.
+    """
+    if is_naca(airfoil_name):
+        ident = 'naca' + airfoil_name
+    else:
+        with open(dat_path(airfoil_name), 'rb') as file:
+            ident = hashlib.sha256(file.read()).hexdigest()[:24]
+
+    return '{}_cst{}_v{}'.format(ident, CST_ORDER, LIBRARY_VERSION)
+
+
+def read_dat(airfoil_name):
+    """ Reads a Selig format .dat file into coordinate arrays. """
+    file = np.loadtxt(dat_path(airfoil_name), skiprows=1)
+    return file[:, 0], file[:, 1]
+
+
+def fit_cst(x, y, naca):
+    """
+    Fits the upper and lower CST coefficients of an airfoil.
+    :param x: chordwise coordinates, from the trailing edge over the upper side to the lower side
+    :param y: vertical coordinates
+    :param naca: the coordinates come from a NACA curve (points ahead of the leading edge are dropped)
+    :return: upper coefficients, lower coefficients
+    """
+    if naca:
+        keep = x >= 0
+        x, y = x[keep], y[keep]
+        # The upper side ends at the last point of the first monotonically decreasing run of x.
+        i = 1 + int(np.count_nonzero(np.diff(np.concatenate(([1.1], x))) < 0))
+    else:
+        i = int(len(x)/2 - 0.5)
+
+    coeff_u = cst.fit(x[0:i], y[0:i], CST_ORDER)[0]
+    coeff_l = cst.fit(x[i:-1], y[i:-1], CST_ORDER)[0]
+    return np.asarray(coeff_u, dtype=float), np.asarray(coeff_l, dtype=float)
+
+
+def lookup(airfoil_name):
+    """
+    Returns the library entry of an airfoil, or None if it has not been computed yet.
+    :param airfoil_name: NACA designation or name of the .dat file
+    :return: dict with 'x', 'y', 'cst_u' and 'cst_l' arrays
+    """
+    key = airfoil_key(airfoil_name)
+    if key in _entries:
+        return _entries[key]
+
+    path = os.path.join(CACHE_DIR, key + '.npz')
+    if not os.path.isfile(path):
+        return None
+
+    with np.load(path) as data:
+        entry = {name: data[name] for name in data.files}
+
+    _entries[key] = entry
+    return entry
+
+
+def store(airfoil_name, x, y):
+    """
+    Fits the CST coefficients of an airfoil and adds it to the library.
+    :param airfoil_name: NACA designation or name of the .dat file
+    :param x: chordwise coordinates
+    :param y: vertical coordinates
+    :return: library entry
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    coeff_u, coeff_l = fit_cst(x, y, is_naca(airfoil_name))
+    entry = {'x': x, 'y': y, 'cst_u': coeff_u, 'cst_l': coeff_l}
+
+    key = airfoil_key(airfoil_name)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, key + '.npz')
+    tmp_path = path + '.{}.tmp'.format(os.getpid())
+    with open(tmp_path, 'wb') as file:
+        np.savez(file, **entry)
+    os.replace(tmp_path, path)
+
+    _entries[key] = entry
+    return entry
@@ -0,0 +1,71 @@
+import numpy as np
+from scipy.special import binom
+
+
+# Class function parameters of cst.cst for airfoil shapes
+N1 = 0.5
+N2 = 1.0
+
+
+def chord_stations(n_points=40, spacing='linear'):
+    """
+    Chordwise stations at which the profiles are evaluated.
+    :param n_points: number of stations per side, leading and trailing edge included
+    :param spacing: 'linear' or 'cosine' (clustered towards leading and trailing edge)
+    :return: array of x/c between 0 and 1
+    """
+    if spacing == 'linear':
+        return np.linspace(0, 1, n_points)
+    if spacing == 'cosine':
+        return 0.5 * (1 - np.cos(np.linspace(0, np.pi, n_points)))
+    raise ValueError("Profile spacing must be 'linear' or 'cosine', got {}".format(spacing))
+
+
+def cst_matrix(x, order, n1=N1, n2=N2):
+    """
+    Class function times Bernstein basis, evaluated at the stations x. Multiplying it by a set of coefficients
+    gives the same ordinates as cst.cst(x, coefficients) with zero trailing edge displacement.
+    :param x: chordwise stations
+    :param order: number of CST coefficients
+    :return: array of shape (len(x), order)
+    """
+    x = np.asarray(x, dtype=float)[:, np.newaxis]
+    n = order - 1
+    r = np.arange(order)
+    shape = binom(n, r) * x**r * (1 - x)**(n - r)
+    norm = (n1 / (n1 + n2))**n1 * (n2 / (n1 + n2))**n2
+    return x**n1 * (1 - x)**n2 / norm * shape
+
+
+def blend_coefficients(coeff, lower, upper, weight):
+    """
+    Linear interpolation of the CST coefficients of all intermediate stations at once.
+    :param coeff: array (n_airfoils, order) of coefficients at the airfoil stations
+    :param lower: inboard airfoil index of each station, see SpanIndex.airfoils
+    :param upper: outboard airfoil index of each station
+    :param weight: weight of the outboard airfoil at each station
+    :return: array (n_stations, order)
+    """
+    weight = np.asarray(weight, dtype=float)[:, np.newaxis]
+    return (1 - weight) * coeff[lower] + weight * coeff[upper]
+
+
+def section_profiles(coeff_u, coeff_l, x):
+    """
+    Evaluates a batch of CST profiles in a single matrix product.
+    :param coeff_u: array (n_profiles, order) of upper side coefficients
+    :param coeff_l: array (n_profiles, order) of lower side coefficients
+    :param x: chordwise stations
+    :return: array (n_profiles, 2*len(x), 2) of (x, y) coordinates, from the trailing edge over the lower side
+    to the leading edge and back over the upper side
+    """
+    coeff_u = np.atleast_2d(coeff_u)
+    coeff_l = np.atleast_2d(coeff_l)
+    matrix = cst_matrix(x, coeff_u.shape[1])
+    y_u = coeff_u @ matrix.T
+    y_l = coeff_l @ matrix.T
+
+    profiles = np.empty((len(coeff_u), 2 * len(x), 2))
+    profiles[:, :, 0] = np.concatenate((np.flip(x), x))
+    profiles[:, :, 1] = np.concatenate((np.flip(y_l, axis=1), y_u), axis=1)
+    return profiles
@@ -1,8 +1,7 @@
 from parapy.core import *
 from parapy.geom import *
-import cst
-import numpy as np
 from kbeutils.geom.curve import Naca4AirfoilCurve, Naca5AirfoilCurve
+from .airfoil_library import is_naca, lookup, read_dat, store
 
 
 class CurveDraw(GeomBase):
@@ -10,67 +9,51 @@ class CurveDraw(GeomBase):
     airfoil_name = Input('23014')
 
     @Attribute
-    def pts(self):
-        """ Extract airfoil coordinates from a data file and create a list of 3D points.
-        This function is based on the example of Ex.17 from tutorial 5"""
+    def is_naca(self):
+        return is_naca(self.airfoil_name)
+
+    @Attribute
+    def coordinates(self):
+        """ Raw airfoil coordinates: the points of the NACA curve, or the contents of the Selig .dat file.
+        Only evaluated when the airfoil is not in the library yet."""
 
         # A warning of "airfoil not found" could be used here?/wrong order/format
         # SELIG FORMAT AIRFOILS NEED TO BE USED
 
-        name = 'wingbox_code/input_data/airfoils/' + self.airfoil_name + '.dat'
-        file = np.loadtxt(name, skiprows=1)
-        points = []
-        x_lst = []
-        y_lst = []
-        for line in file:
-            x, y = line[0], line[1]
-            points.append(Point(float(x), 0, float(y)))
-            x_lst.append(x)
-            y_lst.append(y)
+        if self.is_naca:
+            pts = self.naca_airfoil.points
+            return [pt.x for pt in pts], [pt.z for pt in pts]
 
-        return points, x_lst, y_lst
+        return read_dat(self.airfoil_name)
 
     @Attribute
-    def cst(self):
-
-        if (self.airfoil_name.isnumeric()
-                and (len(self.airfoil_name) == 5 or
-                     len(self.airfoil_name) == 4)):
-
-            x_lst = [1.1]
-            y_lst = []
-            i = 1
-
-            for j in self.naca_airfoil.points:
-                if j.x >= 0:
-                    x_lst.append(j.x)
-                    y_lst.append(j.z)
-                    if x_lst[-1] < x_lst[-2]:
-                        i = i+1
+    def library_entry(self):
+        """ Coordinates and CST coefficients from the airfoil library. Parsing and fitting only happen the first
+        time an airfoil is used."""
+        entry = lookup(self.airfoil_name)
+        if entry is None:
+            entry = store(self.airfoil_name, *self.coordinates)
+        return entry
 
-            x_lst = x_lst[1:]
-
-        else:
-
-            i = int(len(self.pts[1])/2-0.5)
-            x_lst = self.pts[1]
-            y_lst = self.pts[2]
+    @Attribute
+    def pts(self):
+        """ Airfoil coordinates as a list of 3D points.
+        This function is based on the example of Ex.17 from tutorial 5"""
+        x_lst = self.library_entry['x'].tolist()
+        y_lst = self.library_entry['y'].tolist()
+        points = [Point(x, 0, y) for x, y in zip(x_lst, y_lst)]
 
-        coeff_u = list(cst.fit(x_lst[0:i],
-                               y_lst[0:i],
-                               8)[0])
+        return points, x_lst, y_lst
 
-        coeff_l = list(cst.fit(x_lst[i:-1],
-                               y_lst[i:-1],
-                               8)[0])
-        return coeff_u, coeff_l
+    @Attribute
+    def cst(self):
+        return self.library_entry['cst_u'].tolist(), self.library_entry['cst_l'].tolist()
 
     @Part
     def naca_airfoil(self):
         return DynamicType(type=Naca5AirfoilCurve if len(self.airfoil_name) == 5
         else Naca4AirfoilCurve,
                            designation=self.airfoil_name,
-                           mesh_deflection=0.00001,
                            hidden=True)
 
     @Part
@@ -80,13 +63,10 @@ class CurveDraw(GeomBase):
 
     @Part
     def foil_curve(self):
-        return ScaledCurve(curve_in=self.naca_airfoil if (self.airfoil_name.isnumeric() and
-                                                          (len(self.airfoil_name) == 5 or
-                                                          len(self.airfoil_name) == 4)) else self.non_naca,
+        # NACA curves are also fitted through their cached points, so the analytical curve is only built once
+        return ScaledCurve(curve_in=self.non_naca,
                            reference_point=self.position.point,
-                           factor=1,
-                           mesh_deflection=0.00001)
-
+                           factor=1)
 
 if __name__ == '__main__':
     from parapy.gui import display
@@ -10,6 +10,7 @@ class Cutter(GeomBase):
     wing = Input()
     extend = Input(False)
     hidden = Input(True)
+    web_mode = Input('auto')  # see Spar.web_mode
 
     @Attribute
     def cut_loc_ext(self):
@@ -35,40 +36,29 @@ class Cutter(GeomBase):
 
         return starting_points, chords
 
+    # Airfoil section faces of the wing, shared by all its cutters
+    @Input
+    def airfoil_faces(self):
+        return self.wing.airfoil_faces
+
+    # Cutter with the same cut locations whose web is reused, e.g. the spar an extended cutter is built from
+    base = Input(None)
+
     # Intersections and web definitions.
     @Attribute
     def cutter_intersecs(self):
+        if self.base is not None:
+            return self.base.cutter_intersecs
+
         intersections = []
         for i in range(len(self.cutter_planes)):
             edg = IntersectedShapes(shape_in=self.cutter_planes[i].plane_final_pos,
-                                    tool=self.airfoils_as_shapes[i],
+                                    tool=self.airfoil_faces.airfoils_as_shapes[i],
                                     hidden=True)
             intersections.append(edg.edges)
 
         return intersections
 
-    # Defining airfoils as surfaces to cut.
-    @Part
-    def airfoil_planes(self):
-        return CuttingPlanes(quantify=len(self.cutter_planes),
-                             direction='chordwise',
-                             starting_point=self.wingInfo[0][child.index],
-                             hidden=True)
-
-    @Part
-    def airfoil_wires(self):
-        return IntersectedShapes(quantify=len(self.airfoil_planes),
-                                 shape_in=self.airfoil_planes[child.index].plane_final_pos,
-                                 tool=self.wing.right_wing,
-                                 hidden=True)
-
-    @Part
-    def airfoils_as_shapes(self):
-        return TrimmedSurface(quantify=len(self.airfoil_wires),
-                              built_from=self.airfoil_planes[child.index].plane_final_pos,
-                              island=self.airfoil_wires[child.index].edges[0],
-                              hidden=True)
-
     @Part
     def cutter_planes(self):
         return CuttingPlanes(quantify=len(self.wingInfo[0]),
@@ -90,23 +80,59 @@ class Cutter(GeomBase):
         return Spar(quantify=len(self.cutter_intersecs) - 1,
                     curves=[self.cutter_intersec_curves[child.index],
                             self.cutter_intersec_curves[child.index + 1]],
+                    web_mode=self.web_mode,
                     hidden=True)
 
+    @Attribute
+    def webs(self):
+        return [section.Spar for section in (self.cutter_web if self.base is None else self.base.cutter_web)]
+
     @Part
     def extended_web(self):
-        return ExtendedSurface(quantify=len(self.cutter_web),
-                               surface_in=self.cutter_web[child.index].Spar,
+        return ExtendedSurface(quantify=len(self.webs),
+                               surface_in=self.webs[child.index],
                                distance=5,
                                side='u',
                                hidden=True)
 
     @Part
     def total_cutter(self):
-        return SewnShell([section for section in self.extended_web] if self.extend else
-                         [section.Spar for section in self.cutter_web],
+        return SewnShell([section for section in self.extended_web] if self.extend else self.webs,
                          hidden=self.hidden)
 
 
+class AirfoilFaces(GeomBase):
+    """ Airfoil section faces of a wing, built once and cut by all the cutters of the wing """
+
+    wing = Input()
+
+    @Attribute
+    def profile_starts(self):
+        return [airfoil.airfoil_start for airfoil in self.wing.profile_order[2]]
+
+    # Defining airfoils as surfaces to cut.
+    @Part
+    def airfoil_planes(self):
+        return CuttingPlanes(quantify=len(self.profile_starts),
+                             direction='chordwise',
+                             starting_point=self.profile_starts[child.index],
+                             hidden=True)
+
+    @Part
+    def airfoil_wires(self):
+        return IntersectedShapes(quantify=len(self.airfoil_planes),
+                                 shape_in=self.airfoil_planes[child.index].plane_final_pos,
+                                 tool=self.wing.right_wing,
+                                 hidden=True)
+
+    @Part
+    def airfoils_as_shapes(self):
+        return TrimmedSurface(quantify=len(self.airfoil_wires),
+                              built_from=self.airfoil_planes[child.index].plane_final_pos,
+                              island=self.airfoil_wires[child.index].edges[0],
+                              hidden=True)
+
+
 if __name__ == '__main__':
     from parapy.gui import display
 
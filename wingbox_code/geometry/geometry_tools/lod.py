@@ -0,0 +1,27 @@
+"""
+Level of detail of the tessellation used to display the geometry. It is only applied to display copies of the
+shapes (the views of WingBoxAssessment); the shapes themselves, the STEP files and the FEM mesh do not depend on it.
+"""
+
+# Mesh deflection of surfaces and of curves, per profile, from coarse to fine
+LOD_PROFILES = {'preview': {'surface': 1e-2, 'curve': 1e-3},
+                'presentation': {'surface': 1e-3, 'curve': 1e-4},
+                'export': {'surface': 1e-4, 'curve': 1e-5}}
+
+DEFAULT_LOD = 'preview'
+
+
+def deflection(lod, kind='surface'):
+    """
+    Mesh deflection of a level of detail profile
+    :param lod: profile name, see LOD_PROFILES
+    :param kind: 'surface' or 'curve'
+    :return: mesh deflection
+    """
+    return LOD_PROFILES[lod][kind]
+
+
+def refined(lod):
+    """ Next finer profile, or the same profile if it is already the finest """
+    profiles = list(LOD_PROFILES)
+    return profiles[min(profiles.index(lod) + 1, len(profiles) - 1)]
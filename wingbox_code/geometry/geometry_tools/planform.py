@@ -0,0 +1,72 @@
+import numpy as np
+
+
+def planform_edges(root_chord, spans, tapers, sweeps, dihedrals, twist):
+    """
+    Leading and trailing edge points at every span station, relative to the wing origin. Same construction
+    as WingSec.get_pts: the section origins are chained with the sweep and dihedral of each section, and the
+    chord of each station is rotated by its twist around its quarter chord.
+    :param root_chord: root chord [m]
+    :param spans: span stations [m]
+    :param tapers: chord of each station wrt the root chord
+    :param sweeps: sweep of each section [deg]
+    :param dihedrals: dihedral of each section [deg]
+    :param twist: twist of each station [deg]
+    :return: leading edge points (n_stations, 3), trailing edge points (n_stations, 3)
+    """
+    spans = np.asarray(spans, dtype=float)
+    n = len(spans)
+    b = np.diff(spans)
+
+    origins = np.zeros((n, 3))
+    origins[1:, 0] = np.cumsum(b * np.tan(np.deg2rad(sweeps[:n-1])))
+    origins[1:, 1] = spans[1:] - spans[0]
+    origins[1:, 2] = np.cumsum(b * np.tan(np.deg2rad(dihedrals[:n-1])))
+
+    chords = root_chord * np.asarray(tapers[:n], dtype=float)
+    angle = np.deg2rad(np.asarray(twist[:n], dtype=float))
+
+    le = origins.copy()
+    le[:, 0] += 0.25 * chords * (1 - np.cos(angle))
+    le[:, 2] += 0.25 * chords * np.sin(angle)
+
+    te = origins.copy()
+    te[:, 0] += chords - 0.75 * chords * (1 - np.cos(angle))
+    te[:, 2] -= 0.75 * chords * np.sin(angle)
+
+    return le, te
+
+
+def chord_lines(le, te, span_fractions):
+    """
+    Chord lines at any span fraction. Within a section, the leading and trailing edges are straight lines,
+    so every planform station is a linear interpolation between the two bounding span stations.
+    :param le: leading edge points at the span stations, from planform_edges
+    :param te: trailing edge points at the span stations, from planform_edges
+    :param span_fractions: span fractions wrt the tip
+    :return: start points (n, 3), unit direction vectors (n, 3), chord lengths (n,)
+    """
+    y = le[:, 1] / le[-1, 1]
+    fractions = np.atleast_1d(np.asarray(span_fractions, dtype=float))
+
+    start = np.stack([np.interp(fractions, y, le[:, k]) for k in range(3)], axis=1)
+    end = np.stack([np.interp(fractions, y, te[:, k]) for k in range(3)], axis=1)
+
+    chord = end - start
+    length = np.linalg.norm(chord, axis=1)
+    return start, chord / length[:, np.newaxis], length
+
+
+def planform_area(root_chord, spans, tapers):
+    """ Reference area of the full wing, both halves. """
+    chords = root_chord * np.asarray(tapers[:len(spans)], dtype=float)
+    b = np.diff(np.asarray(spans, dtype=float))
+    return float(np.sum((chords[:-1] + chords[1:]) * b))
+
+
+def mean_aerodynamic_chord(root_chord, spans, tapers):
+    """ Mean aerodynamic chord of the piecewise-trapezoidal wing. """
+    chords = root_chord * np.asarray(tapers[:len(spans)], dtype=float)
+    b = np.diff(np.asarray(spans, dtype=float))
+    c_int = np.sum(b / 3 * (chords[:-1]**2 + chords[:-1] * chords[1:] + chords[1:]**2))
+    return float(2 / planform_area(root_chord, spans, tapers) * c_int)
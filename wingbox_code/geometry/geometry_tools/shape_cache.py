@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from OCC.wrapper.BRep import BRep_Builder
+from OCC.wrapper.BRepTools import BRepTools
+from OCC.wrapper.TopoDS import TopoDS_Shape
+from parapy.core import Input
+from parapy.geom import Compound
+from .airfoil_library import airfoil_key
+
+
+SHAPE_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                               'input_data', 'shape_cache')
+SHAPE_CACHE_VERSION = 3
+SHAPE_CACHE_MAX_BYTES = 2 * 2**30  # Least recently used entries are removed above this size
+
+# Construction version of each cached component. Bump the entry of a component whenever the way it is built
+# changes, so that the files written by the previous construction are no longer served.
+BUILD_VERSIONS = {'wing': 1,             # WingGeom.right_wing
+                  'wingbox': 1,          # WingBox nodes, manifest and mesh
+                  'wingbox_section': 1,  # Pre-fused ribs and stringers of a trapezoid section
+                  'skin_section': 1}     # Skin of a loft section
+
+
+def geometry_hash(values, component=None):
+    """
+    Hash of the inputs that define a geometry. Airfoils are hashed through their library key, so editing a .dat
+    file invalidates the shapes built from it.
+    :param values: dict of geometric inputs
+    :param component: BUILD_VERSIONS entry of the component built from them, if any
+    :return: hex digest
+    """
+    values = dict(values, version=SHAPE_CACHE_VERSION)
+    if component is not None:
+        values['build'] = [component, BUILD_VERSIONS[component]]
+    if 'airfoil_names' in values:
+        values['airfoil_names'] = [airfoil_key(name) for name in values['airfoil_names']]
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode()).hexdigest()[:32]
+
+
+def brep_path(key, name, cache_dir=SHAPE_CACHE_DIR):
+    return os.path.join(cache_dir, key, name + '.brep')
+
+
+def touch_entry(path):
+    """ Marks the cache entry holding a file as used, see prune_cache """
+    try:
+        os.utime(os.path.dirname(path))
+    except OSError:
+        pass
+
+
+def prune_cache(cache_dir=SHAPE_CACHE_DIR, max_bytes=SHAPE_CACHE_MAX_BYTES, keep=()):
+    """
+    Removes the least recently used cache entries (one folder per key) until the cache is below max_bytes
+    :param keep: keys that are never removed, e.g. the entry being written
+    :return: number of removed entries
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    entries = []
+    for key in os.listdir(cache_dir):
+        folder = os.path.join(cache_dir, key)
+        if os.path.isdir(folder) and key not in keep:
+            size = sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder))
+            entries.append((os.path.getmtime(folder), size, folder))
+    total = sum(entry[1] for entry in entries)
+
+    removed = 0
+    for _, size, folder in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(folder, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+_pruned = set()
+
+
+def prepare_entry(path):
+    """ Creates the cache entry of a file about to be written. The cache is pruned once per process. """
+    folder = os.path.dirname(path)
+    cache_dir = os.path.dirname(folder)
+    if cache_dir not in _pruned:
+        _pruned.add(cache_dir)
+        prune_cache(cache_dir, keep=(os.path.basename(folder),))
+    os.makedirs(folder, exist_ok=True)
+
+
+def read_brep(path):
+    """ Reads a native OCC .brep file. """
+    shape = TopoDS_Shape()
+    if not BRepTools.Read(shape, path, BRep_Builder()):
+        raise IOError('Could not read BREP file {}'.format(path))
+    touch_entry(path)
+    return shape
+
+
+def write_brep(shape, path):
+    """ Writes a shape to a native OCC .brep file. The file only appears once it is complete. """
+    prepare_entry(path)
+    tmp_path = path + '.{}.tmp'.format(os.getpid())
+    if not BRepTools.Write(shape, tmp_path):
+        raise IOError('Could not write BREP file {}'.format(path))
+    os.replace(tmp_path, path)
+
+
+def brep_bytes(shape):
+    """ Native BREP serialization of a shape, e.g. to send it between processes. """
+    handle, path = tempfile.mkstemp(suffix='.brep')
+    os.close(handle)
+    try:
+        if not BRepTools.Write(shape, path):
+            raise IOError('Could not serialize shape to BREP')
+        with open(path, 'rb') as file:
+            return file.read()
+    finally:
+        os.remove(path)
+
+
+def write_brep_bytes(data, path):
+    """ Stores serialized BREP data as a .brep file. The file only appears once it is complete. """
+    prepare_entry(path)
+    tmp_path = path + '.{}.tmp'.format(os.getpid())
+    with open(tmp_path, 'wb') as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+
+class CachedShape(Compound):
+    """
+    Shape backed by a .brep file. If the file exists, the shape is read from it and shape_in is never evaluated.
+    Otherwise shape_in is built and written to the file. Without filename, it passes shape_in through.
+    """
+
+    shape_in = Input(None)
+    filename = Input(None)
+    built_from = Input(None)  # Not used, the shape comes from filename or shape_in
+
+    def build(self):
+        if self.filename is not None and os.path.isfile(self.filename):
+            return read_brep(self.filename)
+
+        shape = self.shape_in.TopoDS_Shape
+        if self.filename is not None:
+            write_brep(shape, self.filename)
+        return shape
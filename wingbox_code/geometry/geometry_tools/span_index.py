@@ -0,0 +1,93 @@
+import numpy as np
+
+
+class SpanIndex:
+    """
+    Spanwise lookup of a wing. Maps spanwise coordinates (scalars or arrays) to the trapezoid section, the loft
+    section and the bracketing airfoils that contain them, together with the linear interpolation weights.
+    All lookups are a single vectorized searchsorted.
+    """
+
+    def __init__(self, spans, airfoil_sections):
+        self.spans = np.asarray(spans, dtype=float)
+        self.span = self.spans[-1]
+        self.frac_span = self.spans / self.span
+        self.airfoil_sections = np.asarray(airfoil_sections, dtype=float)
+
+        # Span stations without an airfoil get an interpolated one. Fractions are compared exactly, as inputs are.
+        self.inter_stations = np.flatnonzero(~np.isin(self.frac_span, self.airfoil_sections))
+        self.inter_fractions = self.frac_span[self.inter_stations]
+
+        # Bounds of the loft sections (profiles of WingGeom.profile_order), as span fractions
+        self.stations = np.union1d(self.frac_span, self.airfoil_sections)
+
+    @property
+    def inter_sections(self):
+        """ Trapezoid section whose tip carries each interpolated airfoil """
+        return (self.inter_stations - 1).tolist()
+
+    @staticmethod
+    def _bracket(bounds, frac):
+        """ Interval of the sorted bounds containing frac, and the weight of its upper bound. """
+        frac = np.asarray(frac, dtype=float)
+        idx = np.clip(np.searchsorted(bounds, frac, side='right') - 1, 0, len(bounds) - 2)
+        weight = (frac - bounds[idx]) / (bounds[idx + 1] - bounds[idx])
+        return idx, weight
+
+    def section(self, y):
+        """
+        Trapezoid section containing the spanwise coordinates y. Points on a span station belong to the section
+        outboard of it, except for the tip.
+        :param y: spanwise coordinate(s) [m]
+        :return: section index, weight of the section tip (0 at its root, 1 at its tip)
+        """
+        return self._bracket(self.frac_span, np.asarray(y, dtype=float) / self.span)
+
+    def loft_section(self, y):
+        """
+        Loft section (WingGeom.surf_section) containing the spanwise coordinates y.
+        :param y: spanwise coordinate(s) [m]
+        :return: loft section index, weight of its outboard profile
+        """
+        return self._bracket(self.stations, np.asarray(y, dtype=float) / self.span)
+
+    def loft_sections_between(self, y0, y1, tol=1e-6):
+        """
+        Loft sections overlapping the spanwise interval between y0 and y1. Touching a section at its bounds does
+        not count as overlap.
+        :param y0: spanwise coordinate [m]
+        :param y1: spanwise coordinate [m]
+        :param tol: tolerance, as a fraction of the span
+        :return: list of loft section indices
+        """
+        frac0 = min(y0, y1) / self.span + tol
+        frac1 = max(y0, y1) / self.span - tol
+        n = len(self.stations) - 2
+        lower = min(max(int(np.searchsorted(self.stations, frac0, side='right')) - 1, 0), n)
+        upper = min(max(int(np.searchsorted(self.stations, frac1, side='left')) - 1, 0), n)
+        return list(range(lower, max(lower, upper) + 1))
+
+    def airfoils(self, y):
+        """
+        Airfoils bracketing the spanwise coordinates y.
+        :param y: spanwise coordinate(s) [m]
+        :return: inboard airfoil index, outboard airfoil index, weight of the outboard airfoil
+        """
+        idx, weight = self._bracket(self.airfoil_sections, np.asarray(y, dtype=float) / self.span)
+        return idx, idx + 1, weight
+
+    def interpolate(self, y, values):
+        """
+        Linear interpolation of values defined at the span stations, e.g. tapers or spar locations.
+        :param y: spanwise coordinate(s) [m]
+        :param values: one value per span station
+        :return: interpolated values
+        """
+        values = np.asarray(values, dtype=float)
+        idx, weight = self.section(y)
+        return (1 - weight) * values[idx] + weight * values[idx + 1]
+
+    def is_span_station(self, y, tol=1e-6):
+        """ True where the spanwise coordinates y lie on a span station. """
+        y = np.asarray(y, dtype=float)
+        return np.min(np.abs(y[..., np.newaxis] - self.spans), axis=-1) < tol * self.span
@@ -2,42 +2,20 @@ from parapy.core import *
 from parapy.geom import *
 from parapy.geom.occ import SewnShell
 from parapy.core.validate import *
-from ...format.tk_warn import type_warning
+from ...format.input_validation import (check_spans, check_tapers, check_sweeps, check_dihedrals, check_twist,
+                                        check_airfoil_sections, check_airfoil_names)
 from .wingsec import WingSec
 from .airfoil import Airfoil
 from .curvedraw import CurveDraw
+from .planform import planform_edges, chord_lines, planform_area, mean_aerodynamic_chord
+from .shape_cache import CachedShape, brep_path, geometry_hash
+from .span_index import SpanIndex
+from .cutter import AirfoilFaces
+from .cst_sections import blend_coefficients, chord_stations, section_profiles
 import numpy as np
-import cst
-import os
 from kbeutils import avl
 
 
-def intersection_airfoil(span_distribution, airfoil_distribution):
-    frac_span = np.array(span_distribution) / span_distribution[-1]
-
-    diff = np.ones((len(span_distribution), len(airfoil_distribution)))
-    inter = np.ones((len(span_distribution), len(airfoil_distribution)+1))
-
-    p = 0
-    idx = []
-    span_sec = []
-    secs = []
-    for i in range(len(frac_span)):
-        diff[i] = np.ones((1, len(airfoil_distribution))) * frac_span[i] - airfoil_distribution
-        if 0 not in diff[i]:
-            inter[p, :-1] = diff[i]
-            inter[p, -1] = 0
-            sorted_indices = np.argsort(inter[p])
-            pos = np.where(sorted_indices == len(airfoil_distribution))[0][0]
-            idx.append([sorted_indices[pos-1], sorted_indices[pos+1]])
-            span_sec.append(frac_span[i])
-            secs.append(i-1)
-            p = p + 1
-
-    inter = inter[:p, :-1]
-    return inter, idx, p, span_sec, secs
-
-
 class WingGeom(GeomBase):
     # WING GEOMETRY
     # For 1st section
@@ -56,6 +34,13 @@ class WingGeom(GeomBase):
     airfoil_sections = Input(validator=IsInstance(list))  # percentage wrt to root.
     airfoil_names = Input(validator=IsInstance(list))
 
+    # Chordwise resolution of the interpolated profiles
+    profile_points = Input(40, validator=And(Positive(), IsInstance(int)))
+    profile_spacing = Input('linear', validator=OneOf(['linear', 'cosine']))
+
+    # Reuse the shapes of previous runs with the same geometric inputs
+    shape_cache = Input(True, validator=IsInstance(bool))
+
     # SPECIAL VALIDATORS #
 
     @spans.validator
@@ -66,31 +51,7 @@ class WingGeom(GeomBase):
         :param span:
         :return: bool
         """
-        if len(span) != self.n_sections + 1:
-            msg = 'The number of section spans must be coherent with the number of sections.' \
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        if 0 not in span:
-            msg = 'The "0" span station must be kept unchanged'
-            return False, msg
-
-        for i in range(1, len(span[1:])):
-            warn, msg = type_warning(span[i], 'span', (int, float))
-            if not warn:
-                return False, msg
-
-            if span[i] <= 0:
-                msg = 'The section spans cannot be negative or equal to zero. Change section {}'.format(i)
-                return False, msg
-            if span[i] == span[i - 1]:
-                msg = 'Two sections cannot be defined at the same span length. Change section {}'.format(i)
-                return False, msg
-            if span[i] < span[i - 1]:
-                msg = 'The sections must be organized in ascending order. Change section {}'.format(i)
-                return False, msg
-
-        return True
+        return check_spans(span, self.n_sections)
 
     @tapers.validator
     def tapers(self, taper):
@@ -99,21 +60,7 @@ class WingGeom(GeomBase):
         :param taper:
         :return: bool
         """
-        if len(taper) != self.n_sections + 1:
-            msg = 'The number of section tapers must be coherent with the number of sections.' \
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for i in range(len(taper)):
-            warn, msg = type_warning(taper[i], 'taper', (int, float))
-            if not warn:
-                return False, msg
-
-            if taper[i] <= 0:
-                msg = 'The section taper cannot be negative or equal to zero. Change section {}'.format(i)
-                return False, msg
-
-        return True
+        return check_tapers(taper, self.n_sections)
 
     @sweeps.validator
     def sweeps(self, sweep):
@@ -122,21 +69,7 @@ class WingGeom(GeomBase):
         :param sweep:
         :return:
         """
-        if len(sweep) != self.n_sections:
-            msg = 'The number of section sweeps must be coherent with the number of sections.' \
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for i in range(len(sweep)):
-            warn, msg = type_warning(sweep[i], 'sweep', (int, float))
-            if not warn:
-                return False, msg
-
-            if sweep[i] < -85 or sweep[i] > 85:
-                msg = 'The sweep value must be kept in the range [-85, 85] degrees. Change section {}'.format(i)
-                return False, msg
-
-        return True
+        return check_sweeps(sweep, self.n_sections)
 
     @dihedrals.validator
     def dihedrals(self, dihedral):
@@ -145,21 +78,7 @@ class WingGeom(GeomBase):
         :param dihedral:
         :return:
         """
-        if len(dihedral) != self.n_sections:
-            msg = 'The number of section dihedrals must be coherent with the number of sections.' \
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for i in range(len(dihedral)):
-            warn, msg = type_warning(dihedral[i], 'dihedral', (int, float))
-            if not warn:
-                return False, msg
-
-            if dihedral[i] < -85 or dihedral[i] > 85:
-                msg = 'The sweep value must be kept in the range [-85, 85] degrees. Change section {}'.format(i)
-                return False, msg
-
-        return True
+        return check_dihedrals(dihedral, self.n_sections)
 
     @twist.validator
     def twist(self, twists):
@@ -168,20 +87,7 @@ class WingGeom(GeomBase):
         :param twists:
         :return:
         """
-        if len(twists) != self.n_sections + 1:
-            msg = 'The number of section twists must be coherent with the number of sections.' \
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for i in range(len(twists)):
-            warn, msg = type_warning(twists[i], 'twist', (int, float))
-            if not warn:
-                return False, msg
-            if twists[i] < -85 or twists[i] > 85:
-                msg = 'The sweep value must be kept in the range [-85, 85] degrees. Change section {}'.format(i)
-                return False, msg
-
-        return True
+        return check_twist(twists, self.n_sections)
 
     @airfoil_sections.validator
     def airfoil_sections(self, sections):
@@ -190,34 +96,7 @@ class WingGeom(GeomBase):
         :param sections:
         :return:
         """
-        if len(sections) != self.n_airfoils:
-            msg = 'The number of airfoil locations must be coherent with the number of airfoils.' \
-                  ' If you want to add/remove sections, change n_airfoils'
-            return False, msg
-
-        if (0 or 1) not in sections:
-            msg = 'Either no tip or no root airfoil was input'
-            return False, msg
-
-        for i in range(1, len(sections[1:])):
-            warn, msg = type_warning(sections[i], 'airfoil sections', (int, float))
-            if not warn:
-                return False, msg
-            if sections[i] <= 0:
-                msg = 'The airfoil span sections cannot be negative or equal to zero.' \
-                      'Change airfoil location {}'.format(i)
-                return False, msg
-            if sections[i] == sections[i - 1]:
-                msg = 'Two airfoils cannot be defined at the same span length. Change airfoil location {}'.format(i)
-                return False, msg
-            if sections[i] < sections[i - 1]:
-                msg = 'The airfoils must be organized in ascending order. Change airfoil location {}'.format(i)
-                return False, msg
-            if sections[i] > 1 or sections[i] < 0:
-                msg = 'The airfoil location cannot be located outside of the span. Change airfoil location {}'.format(i)
-                return False, msg
-
-        return True
+        return check_airfoil_sections(sections, self.n_airfoils)
 
     @airfoil_names.validator
     def airfoil_names(self, names):
@@ -227,51 +106,20 @@ class WingGeom(GeomBase):
         :param names:
         :return:
         """
+        return check_airfoil_names(names, self.n_airfoils)
 
-        name_database_dat = os.listdir('wingbox_code/input_data/airfoils')
-        name_database = [name.split('.')[0] for name in name_database_dat]
-
-        if len(names) != self.n_airfoils:
-            msg = 'The number of airfoil names must be coherent with the number of airfoils.' \
-                  ' If you want to add/remove sections, change n_airfoils'
-            return False, msg
-
-        for i in range(len(names)):
-            warn, msg = type_warning(names[i], 'airfoil names', str)
-            if not warn:
-                return False, msg
-
-            if (names[i] not in name_database) and not (len(names[i]) == 4 or len(names[i]) == 5):
-                msg = 'Invalid airfoil name. Make sure the name is correctly written or contains either 4 or 5 digits.'
-                return False, msg
-
-        return True
+    @Attribute
+    def span_index(self):
+        """ Spanwise lookup of sections, loft sections and airfoils, shared by the wingbox systems """
+        return SpanIndex(self.spans, self.airfoil_sections)
 
     @Attribute
     def planform_area(self):
-
-        s = 0
-        for i in range(len(self.spans)-1):
-            cr = self.root_chord*self.tapers[i]
-            tap = self.tapers[i+1]/self.tapers[i]
-            b = self.spans[i+1] - self.spans[i]
-            s = s + cr*(1+tap)*b
-
-        return s
+        return planform_area(self.root_chord, self.spans, self.tapers)
 
     @Attribute
     def mac(self):
-
-        s = self.planform_area
-        c_int = 0
-        for i in range(len(self.spans)-1):
-            cr = self.root_chord*self.tapers[i]
-            tap = self.tapers[i+1]/self.tapers[i]
-            b = self.spans[i+1] - self.spans[i]
-            c_int = c_int + b/3*cr**2*(tap**2 + tap + 1)
-
-        mac = 2/s*c_int
-        return mac
+        return mean_aerodynamic_chord(self.root_chord, self.spans, self.tapers)
 
     # @Attribute
     # def c_4mac(self):
@@ -283,64 +131,60 @@ class WingGeom(GeomBase):
     #     return c_4mac
 
     @Attribute
-    def airfoil_guides(self):
-        edges = []
-        for j in range(len(self.spans)-1):
-            for i in range(len(self.airfoil_sections)):
-                edg = IntersectedShapes(
-                    shape_in=self.airfoil_planes[i],
-                    tool=self.wiresec[j].sec_plane)
-                edges.append(edg.edges)
-
-        edges = list(filter(None, edges))
-        edges_clean = []
+    def shape_key(self):
+        """ Hash of the inputs that define the wing shape """
+        return geometry_hash({'root_chord': self.root_chord, 'spans': self.spans, 'tapers': self.tapers,
+                              'sweeps': self.sweeps, 'dihedrals': self.dihedrals, 'twist': self.twist,
+                              'airfoil_sections': self.airfoil_sections, 'airfoil_names': self.airfoil_names,
+                              'profile_points': self.profile_points, 'profile_spacing': self.profile_spacing,
+                              'position': list(self.position.point)}, 'wing')
 
-        for i in range(len(edges)):
-            if edges[i][0].start.y != edges[i-1][0].start.y:
-                edges_clean.append(edges[i])
+    @Attribute
+    def planform(self):
+        """ Leading and trailing edge points at the span stations, relative to the wing origin. """
+        return planform_edges(self.root_chord, self.spans, self.tapers, self.sweeps, self.dihedrals, self.twist)
 
-        return edges_clean
+    def chord_guides(self, span_fractions):
+        """
+        Chord lines of the planform at the given span fractions.
+        :param span_fractions: list of span fractions wrt the tip
+        :return: list of leading edge points, list of unit direction vectors, list of chord lengths
+        """
+        start, direction, length = chord_lines(*self.planform, span_fractions)
+        origin = self.position.point
+        return ([origin + Vector(*pt) for pt in start.tolist()],
+                [Vector(*vec) for vec in direction.tolist()],
+                length.tolist())
 
     @Attribute
-    def airfoil_interp(self):
-        coeff_u = np.zeros((len(self.airfoil_sections), 8))
-        coeff_l = np.zeros((len(self.airfoil_sections), 8))
+    def airfoil_guides(self):
+        """ Chord lines at the airfoil stations """
+        return self.chord_guides(self.airfoil_sections)
 
-        for i in range(len(self.airfoil_sections)):
-            coeff_u[i] = self.airfoil_unscaled[i].cst[0]
-            coeff_l[i] = self.airfoil_unscaled[i].cst[1]
+    @Attribute
+    def inter_guides(self):
+        """ Chord lines at the section breaks with an interpolated airfoil """
+        return self.chord_guides(self.span_index.inter_fractions.tolist())
 
-        inter, idx, p, s_span, secs = intersection_airfoil(self.spans, self.airfoil_sections)
+    @Attribute
+    def airfoil_interp(self):
+        """ Interpolated profiles at the section breaks between airfoil stations, evaluated for all stations at once.
+        Profiles are kept as (x, y) arrays, the curves are only fitted by airfoil_interp_unscaled."""
+        coeff_u = np.array([curve.cst[0] for curve in self.airfoil_unscaled])
+        coeff_l = np.array([curve.cst[1] for curve in self.airfoil_unscaled])
 
         # Linear interpolation
-        airfoils = []
-        for i in range(p):
-            d_1 = -inter[i, idx[i][0]]
-            d_2 = inter[i, idx[i][1]]
-            d_t = d_1 + d_2
-
-            cst_u = (d_t-d_1)/d_t * coeff_u[idx[i][0], :] + (d_t-d_2)/d_t * coeff_u[idx[i][1], :]
-            cst_l = (d_t-d_1)/d_t * coeff_l[idx[i][0], :] + (d_t-d_2)/d_t * coeff_l[idx[i][1], :]
-
-            x_i = np.linspace(0, 1, 40)
-            y_u = cst.cst(x_i, cst_u)
-            y_l = cst.cst(x_i, cst_l)
-
-            x = np.concatenate((np.flip(x_i), x_i))
-            y = np.concatenate((np.flip(y_l), y_u))
+        lower, upper, weight = self.span_index.airfoils(self.span_index.inter_fractions*self.spans[-1])
+        x_i = chord_stations(self.profile_points, self.profile_spacing)
+        airfoils = section_profiles(blend_coefficients(coeff_u, lower, upper, weight),
+                                    blend_coefficients(coeff_l, lower, upper, weight),
+                                    x_i)
 
-            points = []
-            for j in range(len(x)):
-                points.append(Point(x[j], 0, y[j]))
-
-            airfoils.append(points)
-
-        return airfoils, secs
+        return airfoils, self.span_index.inter_sections
 
     @Attribute
     def profile_order(self):
-        inter, idx, p, s_span, secs = intersection_airfoil(self.spans, self.airfoil_sections)
-        stations = self.airfoil_sections + s_span
+        stations = self.airfoil_sections + self.span_index.inter_fractions.tolist()
         sorted_indices = sorted(range(len(stations)), key=lambda k: stations[k])
 
         airfoils = []
@@ -358,6 +202,11 @@ class WingGeom(GeomBase):
 
         return scaled_order, guides_order, unscaled_order
 
+    @Attribute
+    def profile_stations(self):
+        """ Spanwise position of the profiles of profile_order, i.e. the bounds of each surf_section """
+        return (self.span_index.stations*self.spans[-1]).tolist()
+
     @Part
     def wiresec(self):
         return WingSec(quantify=len(self.spans)-1,        # this is how the quantity is determined
@@ -371,22 +220,13 @@ class WingGeom(GeomBase):
                        child.previous.nextorigin()
                        )
 
-    @Part
-    def airfoil_planes(self):
-        return RectangularSurface(
-            quantify=len(self.airfoil_sections),
-            width=100*self.root_chord,
-            length=100*self.root_chord,
-            position=translate(rotate90(self.position, 'x'),
-                               'z',
-                               -self.spans[-1]*self.airfoil_sections[child.index]),
-            hidden=True)
-
     @Part
     def airfoil_chords(self):
-        return ComposedCurve(quantify=len(self.airfoil_guides),
-                             built_from=self.airfoil_guides[child.index],
-                             line_thickness=2)
+        return LineSegment(quantify=len(self.airfoil_sections),
+                           start=self.airfoil_guides[0][child.index],
+                           end=self.airfoil_guides[0][child.index]
+                           + self.airfoil_guides[1][child.index]*self.airfoil_guides[2][child.index],
+                           line_thickness=2)
 
     @Part
     def airfoil_unscaled(self):
@@ -397,45 +237,61 @@ class WingGeom(GeomBase):
     @Part
     def airfoil_interp_unscaled(self):
         return FittedCurve(quantify=len(self.airfoil_interp[1]),
-                           points=self.airfoil_interp[0][child.index],
+                           points=[Point(x, 0, y) for x, y in self.airfoil_interp[0][child.index].tolist()],
                            hidden=False)
 
     @Part
     def airfoils(self):
         return Airfoil(quantify=len(self.airfoil_sections),
                        airfoil_curve=self.airfoil_unscaled[child.index].foil_curve,
-                       airfoil_start=self.airfoil_chords[child.index].start,
-                       airfoil_direction=self.airfoil_chords[child.index].direction_vector,
-                       airfoil_chord=self.airfoil_chords[child.index].length)
+                       airfoil_start=self.airfoil_guides[0][child.index],
+                       airfoil_direction=self.airfoil_guides[1][child.index],
+                       airfoil_chord=self.airfoil_guides[2][child.index])
 
     @Part
     def inter_airfoils(self):
         return Airfoil(quantify=len(self.airfoil_interp[1]),
                        airfoil_curve=self.airfoil_interp_unscaled[child.index],
-                       airfoil_start=self.wiresec[self.airfoil_interp[1][child.index]].sec_chords_out.start.location,
-                       airfoil_direction=self.wiresec[self.airfoil_interp[1][child.index]].sec_chords_out.direction_vector,
-                       airfoil_chord=self.wiresec[self.airfoil_interp[1][child.index]].sec_chords_out.length)
+                       airfoil_start=self.inter_guides[0][child.index],
+                       airfoil_direction=self.inter_guides[1][child.index],
+                       airfoil_chord=self.inter_guides[2][child.index])
 
     @Part
-    def surf_section(self):
+    def lofted_sections(self):
         return LoftedShell(quantify=len(self.profile_order[0])-1,
                            profiles=self.profile_order[0][child.index:child.index+2],
-                           mesh_deflection=1e-4,
                            hidden=True)
 
+    # Loft sections in the shape cache, so that processes building the wingbox in parallel do not loft them again
     @Part
-    def right_wing(self):
+    def surf_section(self):
+        return CachedShape(quantify=len(self.lofted_sections),
+                           shape_in=self.lofted_sections[child.index],
+                           filename=(brep_path(self.shape_key, 'surf_section_{}'.format(child.index))
+                                     if self.shape_cache else None),
+                           hidden=True)
+
+    @Part
+    def sewn_wing(self):
         return SewnShell(self.surf_section,
-                         mesh_deflection=1e-4,)
+                         hidden=True)
+
+    @Part
+    def right_wing(self):
+        return CachedShape(shape_in=self.sewn_wing,
+                           filename=brep_path(self.shape_key, 'right_wing') if self.shape_cache else None)
 
     @Part
     def left_wing(self):
         return MirroredShape(shape_in=self.right_wing,
                              reference_point=XOY,
                              vector1=Vector(1, 0, 0),
-                             vector2=Vector(0, 0, 1),
-                             mesh_deflection=1e-4,)
+                             vector2=Vector(0, 0, 1))
 
+    @Part
+    def airfoil_faces(self):
+        return AirfoilFaces(wing=self,
+                            hidden=True)
 
 
 if __name__ == '__main__':
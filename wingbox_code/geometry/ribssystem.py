@@ -30,41 +30,27 @@ class RibsSystem(GeomBase):
 
         return rib_lst
 
-        # Check which cutting plane to use in each rib.
-
+    # Check which cutting plane to use in each rib.
     @Attribute
     def cut_plane_idx(self):
-        cut_plane_idx = 0
-        disp_accum = 0
-        ribs_idx = 0
-        cut_plane_lst = []
-
-        for i in range(len(self.cutting_TE_planes)):
-            cut_plane_idx_old = cut_plane_idx
-            for j in range(len(self.ribs_list)):
-                if self.ribs_list[j].cog[1] > \
-                        round(self.cutting_TE_planes[i].plane_final_transl.displacement[1], 2) * 2 + disp_accum:
-                    disp_accum += self.cutting_TE_planes[i].plane_final_transl.displacement[1] * 2
-                    cut_plane_idx += 1
-                    ribs_idx = j
-
-                if cut_plane_idx == cut_plane_idx_old and j >= ribs_idx:
-                    cut_plane_lst.append(cut_plane_idx)
+        """ Trapezoid section of each rib, i.e. the TE cutting plane that applies to it """
+        return self.wing.span_index.section(self.rib_distribution)[0].tolist()
 
-        return cut_plane_lst
+    @Part
+    def sections(self):
+        """ Ribs of each trapezoid section """
+        return RibSection(quantify=len(self.rib_idx),
+                          system=self,
+                          section=child.index,
+                          n_ribs=self.rib_idx[child.index])
 
     @Attribute
     def rib_distribution(self):
+        return [y for section in self.sections for y in section.rib_distribution]
 
-        n_r = self.rib_idx
-        r_span = []
-        for section in range(len(n_r)):
-            for i in range(n_r[section]):
-                r_span.append(i * (self.wing.spans[section+1] - self.wing.spans[section])/n_r[section]
-                              + self.wing.spans[section])
-
-        r_span.append(self.wing.spans[-1])
-        return r_span
+    @Attribute
+    def ribs(self):
+        return [rib for section in self.sections for rib in section.ribs]
 
     @Attribute
     def rib_sections(self):
@@ -100,43 +86,112 @@ class RibsSystem(GeomBase):
                               island=self.rib_sections[child.index],
                               hidden=True)
 
+    @Part
+    def te_cutter(self):
+        return Cutter(wing=self.wing,
+                      cut_loc=self.TE_gap,
+                      extend=True,
+                      hidden=True)
+
+
+class RibSection(GeomBase):
+    """ Ribs of one trapezoid section of the wing. The tip section also holds the tip rib. """
+
+    system = Input()  # RibsSystem
+
+    section = Input()
+    n_ribs = Input()
+
+    @Input
+    def wing(self):
+        return self.system.wing
+
+    @Attribute
+    def rib_distribution(self):
+        y0, y1 = self.wing.spans[self.section], self.wing.spans[self.section + 1]
+        r_span = [i * (y1 - y0)/self.n_ribs + y0 for i in range(self.n_ribs)]
+        if self.section == len(self.wing.spans) - 2:
+            r_span.append(y1)
+        return r_span
+
+    @Attribute
+    def rib_loft_idx(self):
+        """ Index of the loft section (wing.surf_section) containing each rib station """
+        return self.wing.span_index.loft_section(self.rib_distribution)[0].tolist()
+
+    @Attribute
+    def loft_groups(self):
+        """ Loft sections holding at least one rib, with the indices of their ribs """
+        groups = {}
+        for rib, section in enumerate(self.rib_loft_idx):
+            groups.setdefault(section, []).append(rib)
+        return sorted(groups.items())
+
+    @Part
+    def section_cuts(self):
+        """ All rib planes of a loft section cut in a single operation, against that section only """
+        return IntersectedShapes(quantify=len(self.loft_groups),
+                                 shape_in=self.wing.surf_section[self.loft_groups[child.index][0]],
+                                 tool=[self.ribs_uncut[rib].cut_tool for rib in self.loft_groups[child.index][1]],
+                                 hidden=True)
+
+    @Attribute
+    def rib_islands(self):
+        """ Closed section of the skin at each rib station, sorted out of the batched cuts by their y """
+        tol = 1e-6*self.wing.spans[-1]
+        islands = [None]*len(self.rib_distribution)
+        for cut, (section, ribs) in zip(self.section_cuts, self.loft_groups):
+            edges = cut.edges
+            for rib in ribs:
+                y = self.rib_distribution[rib]
+                islands[rib] = [edge for edge in edges if abs(edge.start.y - y) < tol]
+        return islands
+
     @Part
     def ribs_uncut(self):
         return Rib(quantify=len(self.rib_distribution),
                    rib_span=self.rib_distribution[child.index],
                    skin_shell=self.wing.right_wing,
                    root_chord=self.wing.root_chord,
+                   island=self.rib_islands[child.index],
                    hidden=True)
 
+    @Attribute
+    def rib_group(self):
+        """ Index in loft_groups of the loft section of each rib """
+        groups = [section for section, _ in self.loft_groups]
+        return [groups.index(section) for section in self.rib_loft_idx]
+
+    @Attribute
+    def local_webs(self):
+        """ Extended TE cutter webs of each loft section holding ribs and of its neighbours, so that ribs at the
+        bounds of a section are cut as well """
+        webs = self.system.te_cutter.extended_web
+        return [[webs[k] for k in range(max(section - 1, 0), min(section + 2, len(webs)))]
+                for section, _ in self.loft_groups]
+
     @Part
-    def te_cutter(self):
-        return Cutter(wing=self.wing,
-                      cut_loc=self.TE_gap,
-                      extend=True)
+    def local_cutters(self):
+        return SewnShell(quantify=len(self.loft_groups),
+                         built_from=self.local_webs[child.index],
+                         hidden=True)
 
     @Part
     def ribs_cut_basis(self):
+        # Split against the cutter of the loft section only, not the whole-wing TE cutter
         return SplitSurface(quantify=len(self.rib_distribution),
                             built_from=self.ribs_uncut[child.index].rib_surf,
-                            tool=self.te_cutter.total_cutter,
+                            tool=self.local_cutters[self.rib_group[child.index]],
                             hidden=True)
 
-    @Part
-    def rib_cut_wires(self):
-        return IntersectedShapes(quantify=len(self.ribs_cut_basis),
-                                 shape_in=self.ribs_cut_basis[child.index].faces[1],
-                                 tool=self.ribs_uncut[child.index].cut_tool,
-                                 hidden=True)
-
     @Part
     def ribs(self):
-        return TrimmedSurface(quantify=len(self.rib_distribution),
-                              built_from=self.ribs_uncut[child.index].cut_tool,
-                              island=self.rib_cut_wires[child.index].edges,
-                              mesh_deflection=1e-4)
-
+        # Face ahead of the TE cut, i.e. the one with the foremost centre of gravity, so the result does not depend
+        # on the order in which the split returns the faces
+        return Compound(quantify=len(self.rib_distribution),
+                        built_from=[min(self.ribs_cut_basis[child.index].faces, key=lambda face: face.cog.x)])
 
 if __name__ == '__main__':
     from parapy.gui import display
 
-    display(RibsSystem())
\ No newline at end of file
+    display(RibsSystem())
@@ -1,6 +1,8 @@
 from parapy.core import *
 from parapy.geom import *
+import numpy as np
 from .geometry_tools.cutter import Cutter
+from .geometry_tools.shape_cache import CachedShape, brep_path, geometry_hash
 
 
 class SkinSystem(GeomBase):
@@ -15,26 +17,77 @@ class SkinSystem(GeomBase):
                       extend=True,
                       hidden=True)
 
+    @Attribute
+    def cut_stations(self):
+        """ Spanwise position of each profile and chordwise position of the TE cut there, as placed by the cutter """
+        profiles = self.wing.profile_order[2]
+        return ([profile.airfoil_start.y for profile in profiles],
+                [profile.airfoil_start.x + profile.airfoil_chord*self.TE_gap for profile in profiles])
+
+    @Attribute
+    def section_keys(self):
+        """ Hash of the geometry that defines the skin of each loft section: its two profiles and the cut there """
+        profiles = self.wing.profile_order[0]
+        cut_x = self.cut_stations[1]
+        return [geometry_hash({'profiles': [[list(pt) for pt in profile.control_points]
+                                            for profile in profiles[i:i + 2]],
+                               'cut': cut_x[i:i + 2]}, 'skin_section')
+                for i in range(len(profiles) - 1)]
+
+    @Part
+    def sections(self):
+        """ Skin of each loft section """
+        return SkinSection(quantify=len(self.section_keys),
+                           system=self,
+                           loft=self.wing.surf_section[child.index],
+                           key=self.section_keys[child.index])
+
+    @Attribute
+    def skin_lst(self):
+        return [face for section in self.sections for face in section.skin.faces]
+
+    @Part
+    def skin(self):
+        return SewnShell([section for section in self.skin_lst],
+                         transparency=0.65)
+
+
+class SkinSection(GeomBase):
+    """ Skin of one loft section ahead of the TE cut """
+
+    system = Input()  # SkinSystem
+
+    loft = Input()  # Loft section of the wing (wing.surf_section)
+    key = Input()  # section_keys entry of the section
+
+    @Input
+    def wing(self):
+        return self.system.wing
+
     @Part
     def skin_cut_basis(self):
-        return SplitSurface(built_from=self.wing.right_wing,
-                            tool=self.te_cutter.total_cutter,
+        return SplitSurface(built_from=self.loft,
+                            tool=self.system.te_cutter.total_cutter,
                             hidden=True)
 
     @Attribute
     def skin_lst(self):
+        """ Faces ahead of the TE cut. Faces are classified by the position of their centre of gravity with respect
+        to the cut, so the result does not depend on the order in which the split returns them. """
+        y, x = self.system.cut_stations
+        return [face for face in self.skin_cut_basis.faces if face.cog.x < np.interp(face.cog.y, y, x)]
 
-        skin_lst = []
-        for i in range(int(len(self.skin_cut_basis.faces)/3)):
-            skin_lst.append(self.skin_cut_basis.faces[i*3+2])
-
-        return skin_lst
+    @Part
+    def kept_faces(self):
+        return Compound(built_from=self.skin_lst,
+                        hidden=True)
 
     @Part
     def skin(self):
-        return SewnShell([section for section in self.skin_lst],
-                         mesh_deflection=1e-4,
-                         transparency=0.65)
+        return CachedShape(shape_in=self.kept_faces,
+                           filename=brep_path(self.key, 'skin_section') if self.wing.shape_cache else None,
+                           hidden=True)
+
 
 if __name__ == '__main__':
     from parapy.gui import display
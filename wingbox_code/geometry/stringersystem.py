@@ -1,8 +1,8 @@
 from parapy.core import *
 from parapy.geom import *
 import numpy as np
-from .geometry_tools.cutter import Cutter
 from .elements.stringer import Stringer
+from .geometry_tools.cutter import Cutter
 
 
 def division_lst(nested_arr):
@@ -40,45 +40,33 @@ class StringerSystem(GeomBase):
 
         return curves
 
+    @Part
+    def sections(self):
+        """ Stringers of each trapezoid section """
+        return StringerSection(quantify=len(self.stringer_idx),
+                               system=self,
+                               section=child.index,
+                               n_top=self.stringer_idx[child.index][0],
+                               n_bottom=self.stringer_idx[child.index][1])
+
     @Attribute
     def stringer_hooks(self):
-
-        hooks_up = []
-        hooks_down = []
-        curves = self.wire_stringer
-        div_lst = division_lst(np.array(self.stringer_idx))
-
-        for i in range(len(self.split_foils)-1):
-            c1up = SplitCurve(curve_in=curves[i][0],
-                              tool=[x*(curves[i][0].u2-curves[i][0].u1) + curves[i][0].u1 for x in div_lst[i][0]])
-            c1do = SplitCurve(curve_in=curves[i][1],
-                              tool=[x*(curves[i][1].u2-curves[i][1].u1) + curves[i][1].u1 for x in div_lst[i][1]])
-            c2up = SplitCurve(curve_in=curves[i+1][0],
-                              tool=[x*(curves[i+1][0].u2-curves[i+1][0].u1) + curves[i+1][0].u1 for x in div_lst[i][0]])
-            c2do = SplitCurve(curve_in=curves[i+1][1],
-                              tool=[x*(curves[i+1][1].u2-curves[i+1][1].u1) + curves[i+1][1].u1 for x in div_lst[i][1]])
-
-            for j in range(len(div_lst[i][0])):
-                stringer = [c1up.curves_in[j].end, c2up.curves_in[j].end]
-                hooks_up.append(stringer)
-
-            for j in range(len(div_lst[i][1])):
-                stringer = [c1do.curves_in[j].end, c2do.curves_in[j].end]
-                hooks_down.append(stringer)
-
-        return hooks_up, hooks_down
+        return ([hook for section in self.sections for hook in section.stringer_hooks[0]],
+                [hook for section in self.sections for hook in section.stringer_hooks[1]])
 
     @Part
     def airfoil_cut_front(self):
         return Cutter(cut_loc=self.spars.spar_stations[0],
                       wing=self.wing,
-                      extend=True)
+                      extend=True,
+                      base=self.spars.spars[0])
 
     @Part
     def airfoil_cut_rear(self):
         return Cutter(cut_loc=self.spars.spar_stations[1],
                       wing=self.wing,
-                      extend=True)
+                      extend=True,
+                      base=self.spars.spars[1])
 
     @Part
     def intersect_front(self):
@@ -104,21 +92,73 @@ class StringerSystem(GeomBase):
                                 self.intersect_front[child.index].edges[0].end],
                           hidden=True)
 
+    @Attribute
+    def top_stringers(self):
+        return [stringer for section in self.sections for stringer in section.top_stringers]
+
+    @Attribute
+    def bottom_stringers(self):
+        return [stringer for section in self.sections for stringer in section.bottom_stringers]
+
+
+class StringerSection(GeomBase):
+    """ Stringers of one trapezoid section of the wing, between the essential ribs at its span stations """
+
+    system = Input()  # StringerSystem
+
+    section = Input()
+    n_top = Input()
+    n_bottom = Input()
+
+    @Input
+    def wing(self):
+        return self.system.wing
+
+    @Attribute
+    def stringer_hooks(self):
+
+        hooks = []
+        curves = self.system.wire_stringer
+        div_lst = division_lst(np.array([[self.n_top, self.n_bottom]]))[0]
+        i = self.section
+
+        for side in range(2):
+            c1 = SplitCurve(curve_in=curves[i][side],
+                            tool=[x*(curves[i][side].u2-curves[i][side].u1) + curves[i][side].u1
+                                  for x in div_lst[side]])
+            c2 = SplitCurve(curve_in=curves[i+1][side],
+                            tool=[x*(curves[i+1][side].u2-curves[i+1][side].u1) + curves[i+1][side].u1
+                                  for x in div_lst[side]])
+            hooks.append([[c1.curves_in[j].end, c2.curves_in[j].end] for j in range(len(div_lst[side]))])
+
+        return hooks[0], hooks[1]
+
+    @Attribute
+    def stringer_sections(self):
+        """ Loft sections (wing.surf_section) each top and bottom stringer runs over """
+        index = self.wing.span_index
+        sections = []
+        for hooks in self.stringer_hooks:
+            sections.append([[self.wing.surf_section[k] for k in index.loft_sections_between(start.y, end.y)]
+                             for start, end in hooks])
+        return sections
+
     @Part
     def top_stringers(self):
-        return Stringer(quantify=len(self.stringer_hooks[0]),
+        return Stringer(quantify=self.n_top,
                         start=self.stringer_hooks[0][child.index][0],
                         end=self.stringer_hooks[0][child.index][1],
                         wing=self.wing,
+                        sections=self.stringer_sections[0][child.index],
                         up=True,
                         hidden=False)
 
     @Part
     def bottom_stringers(self):
-        return Stringer(quantify=len(self.stringer_hooks[1]),
+        return Stringer(quantify=self.n_bottom,
                         start=self.stringer_hooks[1][child.index][0],
                         end=self.stringer_hooks[1][child.index][1],
                         wing=self.wing,
+                        sections=self.stringer_sections[1][child.index],
                         up=False,
                         hidden=False)
-
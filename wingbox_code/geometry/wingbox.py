@@ -2,7 +2,9 @@ from parapy.core import *
 from parapy.geom import *
 from parapy.exchange import *
 from parapy.core.validate import *
-from ..format.tk_warn import type_warning
+from ..format.input_validation import (check_rib_idx, check_front_spar_loc, check_rear_spar_loc, check_stringer_idx,
+                                       check_te_skin_gap, check_te_ribs_gap)
+from .geometry_tools.shape_cache import CachedShape, brep_path, geometry_hash
 from .ribssystem import RibsSystem
 from .sparsystem import SparSystem
 from .skinsystem import SkinSystem
@@ -30,6 +32,9 @@ class WingBox(GeomBase):
     TE_ribs_gap = Input(validator=Range(0, 0.98))  # Must be after the rearmost rear_spar_loc but less than 0.98
     TE_skin_gap = Input(validator=Range(0, 0.98))  # Must be after the rearmost rear_spar_loc but less than 1
 
+    # Reuse the shapes of previous runs with the same geometric inputs
+    shape_cache = Input(True, validator=IsInstance(bool))
+
     @rib_idx.validator
     def rib_idx(self, ribs):
         """
@@ -37,21 +42,7 @@ class WingBox(GeomBase):
         :param ribs:
         :return:
         """
-        if len(ribs) != self.n_sections:
-            msg = 'The number of section ribs must be coherent with the number of sections.' \
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for rib in ribs:
-            warn, msg = type_warning(rib, 'rib number', int)
-            if not warn:
-                return False, msg
-
-            if rib <= 0:
-                msg = 'The amount of ribs must at least be 1 for every section'
-                return False, msg
-
-        return True
+        return check_rib_idx(ribs, self.n_sections)
 
     @front_spar_loc.validator
     def front_spar_loc(self, fs_locs):
@@ -61,26 +52,7 @@ class WingBox(GeomBase):
         :param fs_locs:
         :return:
         """
-
-        if len(fs_locs) != self.n_sections + 1:
-            msg = 'The number of section front spar locations must be coherent with the number of sections.' \
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for i in range(len(fs_locs)):
-            warn, msg = type_warning(fs_locs[i], 'front spar location', float)
-            if not warn:
-                return False, msg
-
-            if fs_locs[i] <= 0 or fs_locs[i] >= 1:
-                msg = 'Front spar locations must be limited between 0 and 1 to stay within the chord'
-                return False, msg
-
-            if fs_locs[i] >= self.rear_spar_loc[i]:
-                msg = 'The front spar cannot be further aft than the rear spar'
-                return False, msg
-
-        return True
+        return check_front_spar_loc(fs_locs, self.n_sections, self.rear_spar_loc)
 
     @rear_spar_loc.validator
     def rear_spar_loc(self, rs_locs):
@@ -90,45 +62,16 @@ class WingBox(GeomBase):
         :param rs_locs:
         :return:
         """
-
-        if len(rs_locs) != self.n_sections + 1:
-            msg = 'The number of section rear spar locations must be coherent with the number of sections.' \
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for i in range(len(rs_locs)):
-            warn, msg = type_warning(rs_locs[i], 'rear spar location', float)
-            if not warn:
-                return False, msg
-
-            if rs_locs[i] <= 0 or rs_locs[i] >= 1:
-                msg = 'Rear spar locations must be limited between 0 and 1 to stay within the chord'
-                return False, msg
-
-        return True
+        return check_rear_spar_loc(rs_locs, self.n_sections)
 
     @stringer_idx.validator
     def stringer_idx(self, stringers):
-        '''
+        """
         Validates list coherence as well as that the elements are positive and integers
         :param stringers:
         :return:
-        '''
-        if len(stringers) != self.n_sections:
-            msg = 'The number of section stringers must be coherent with the number of sections.' \
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for section in stringers:
-            for num_stringer in section:
-                warn, msg = type_warning(num_stringer, 'stringer', int)
-                if not warn:
-                    return False, msg
-            if len(section) != 2:
-                msg = 'Wrong number of inputs. The list must have two inputs per section: top and bottom stringers.'
-                return False, msg
-
-        return True
+        """
+        return check_stringer_idx(stringers, self.n_sections)
 
     @TE_skin_gap.validator
     def TE_skin_gap(self, value):
@@ -137,15 +80,7 @@ class WingBox(GeomBase):
         :param value:
         :return:
         """
-        for i in range(self.n_sections + 1):
-            if value < self.rear_spar_loc[i]:
-                msg = 'The skin cut location cannot be located further front than the aft spar.'
-                return False, msg
-            if value > 0.98:
-                msg = 'The skin cut location cannot be located more than 98% of the chord'
-                return False, msg
-
-        return True
+        return check_te_skin_gap(value, self.rear_spar_loc)
 
     @TE_ribs_gap.validator
     def TE_ribs_gap(self, value):
@@ -154,23 +89,77 @@ class WingBox(GeomBase):
         :param value:
         :return:
         """
-        for i in range(self.n_sections + 1):
-            if value < self.rear_spar_loc[i]:
-                msg = 'The rib cut location cannot be located further front than the aft spar.'
-                return False, msg
-            if value > 0.98:
-                msg = 'The rib cut location cannot be located more than 98% of the chord'
-                return False, msg
+        return check_te_ribs_gap(value, self.rear_spar_loc)
 
-        return True
+    @Attribute
+    def shape_key(self):
+        """ Hash of the inputs that define the wingbox shapes """
+        return geometry_hash({'wing': self.wing.shape_key,
+                              'rib_idx': self.rib_idx,
+                              'front_spar_loc': self.front_spar_loc,
+                              'rear_spar_loc': self.rear_spar_loc,
+                              'stringer_idx': self.stringer_idx,
+                              'TE_ribs_gap': self.TE_ribs_gap,
+                              'TE_skin_gap': self.TE_skin_gap}, 'wingbox')
+
+    @Attribute
+    def section_keys(self):
+        """ Hash of the inputs that define the ribs and stringers of each trapezoid section """
+        return [geometry_hash({'wing': self.wing.shape_key,
+                               'section': section,
+                               'n_ribs': n_ribs,
+                               'n_stringers': self.stringer_idx[section],
+                               'front_spar_loc': self.front_spar_loc,
+                               'rear_spar_loc': self.rear_spar_loc,
+                               'TE_ribs_gap': self.TE_ribs_gap}, 'wingbox_section')
+                for section, n_ribs in enumerate(self.rib_idx)]
+
+    @Attribute
+    def node_paths(self):
+        """ Where each entry of STEP_node_list is built, as (system, trapezoid section, part, index). Derived from
+        the rib and stringer counts, so the components are not built just to lay them out. The skin and spars span
+        the whole wing and have no section. """
+        paths = [('skin', None, 'skin', 0), ('spars', None, 'spars', 0), ('spars', None, 'spars', 1)]
+        for section, n_ribs in enumerate(self.rib_idx):
+            n_ribs += section == len(self.rib_idx) - 1  # The tip section also holds the tip rib
+            paths.extend([('ribs', section, 'ribs', j) for j in range(n_ribs)])
+        for side, part in enumerate(['top_stringers', 'bottom_stringers']):
+            for section, counts in enumerate(self.stringer_idx):
+                paths.extend([('stringers', section, part, j) for j in range(counts[side])])
+        return paths
+
+    @Attribute
+    def node_labels(self):
+        labels = {'skin': 'skin', 'spars': 'spar', 'ribs': 'rib', 'stringers': 'stringer'}
+        return [labels[path[0]] for path in self.node_paths]
+
+    @Attribute
+    def node_sections(self):
+        return [path[1] for path in self.node_paths]
+
+    def built_node(self, k):
+        """
+        Builds one structural component, and only what it depends on
+        :param k: index in STEP_node_list
+        :return: shape
+        """
+        system, section, part, index = self.node_paths[k]
+        if system == 'skin':
+            return self.skin.skin
+        if system == 'spars':
+            return self.spars.spars[index].total_cutter
+        if system == 'ribs':
+            return self.ribs.sections[section].ribs[index]
+        return getattr(self.stringers.sections[section], part)[index].stringers
+
+    @Attribute
+    def built_nodes(self):
+        """ Structural components built from the wing, in the order of node_paths """
+        return [self.built_node(k) for k in range(len(self.node_paths))]
 
     @Attribute
     def STEP_node_list(self):
-        STEP_lst = [self.skin.skin, self.spars.spars[0].total_cutter, self.spars.spars[1].total_cutter]
-        STEP_lst.extend([rib for rib in self.ribs.ribs])
-        STEP_lst.extend([stringer.stringers for stringer in self.stringers.top_stringers])
-        STEP_lst.extend([stringer.stringers for stringer in self.stringers.bottom_stringers])
-        return STEP_lst
+        return [node for node in self.cached_nodes]
 
     @Part
     def skin(self):
@@ -194,6 +183,14 @@ class WingBox(GeomBase):
     def stringers(self):
         return StringerSystem(pass_down=['spars', 'ribs', 'wing', 'stringer_idx'])
 
+    @Part
+    def cached_nodes(self):
+        return CachedShape(quantify=len(self.node_labels),
+                           shape_in=self.built_node(child.index),
+                           filename=brep_path(self.shape_key, 'node_{}'.format(child.index))
+                           if self.shape_cache else None,
+                           hidden=True)
+
     @Attribute
     def STEP_file(self):
         return STEPWriter(nodes=self.STEP_node_list,
@@ -0,0 +1,340 @@
+import hashlib
+import json
+import os
+import warnings
+
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots')
+SNAPSHOT_VERSION = 2
+
+# Expected types of every input of WingBoxAssessment read from the workbook. List inputs give the type of
+# their elements (None if they are nested and left to the model validators).
+NUMBER = (int, float)
+INPUT_TYPES = {'root_chord': NUMBER,
+               'n_sections': int,
+               'spans': (list, NUMBER),
+               'tapers': (list, NUMBER),
+               'sweeps': (list, NUMBER),
+               'dihedrals': (list, NUMBER),
+               'twist': (list, NUMBER),
+               'n_airfoils': int,
+               'airfoil_sections': (list, NUMBER),
+               'airfoil_names': (list, str),
+               'n_loads': int,
+               'case_settings': (list, None),
+               'weight': NUMBER,
+               'speed': NUMBER,
+               'height': NUMBER,
+               'rib_idx': (list, int),
+               'front_spar_loc': (list, NUMBER),
+               'rear_spar_loc': (list, NUMBER),
+               'stringer_idx': (list, None),
+               'TE_ribs_gap': NUMBER,
+               'TE_skin_gap': NUMBER,
+               'secs': (list, None),
+               'mat_2D': (list, str),
+               'mat_1D': (list, str),
+               'nastran_path': str,
+               'bdf_file_folder': str,
+               'min_elem_size': NUMBER,
+               'max_elem_size': NUMBER,
+               'tc_select': str,
+               'quad_dominance': bool,
+               'bcs': (list, None)}
+
+
+def cell_value(value):
+    """ Converts a raw cell value the same way pandas does: integral numbers become int. """
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def read_workbook(path):
+    """
+    Reads every sheet of the workbook once, in read-only mode.
+    :param path: path to the .xlsx file
+    :return: list of sheets, each a list of rows. The first row of each sheet is taken as its header and
+             dropped, so that sheet[i][j] matches pandas' df.iloc[i, j]
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheets = []
+        for worksheet in workbook.worksheets:
+            rows = [[cell_value(value) for value in row] for row in worksheet.iter_rows(values_only=True)]
+            sheets.append(rows[1:])
+    finally:
+        workbook.close()
+
+    return sheets
+
+
+def cell(sheet, row_idx, column_idx):
+    """ Value of a cell, None if it is empty or outside of the sheet. """
+    if row_idx >= len(sheet) or column_idx >= len(sheet[row_idx]):
+        return None
+    return sheet[row_idx][column_idx]
+
+
+def appender(sheet, row_idx, rib_str=False):
+    """ Extracting the values of a certain parameter along a certain row
+    :param sheet: Sheet from the input file
+    :param row_idx: Row index
+    :param rib_str: Boolean for certain rows where the first column is blacked out
+    :return:
+    """
+    column_idx = 1
+    if rib_str:
+        column_idx = 2
+
+    input_lst = []
+    while cell(sheet, row_idx, column_idx) is not None:
+        input_lst.append(cell(sheet, row_idx, column_idx))
+        column_idx = column_idx + 1
+
+    return input_lst
+
+
+def material_name(sheet, row_idx):
+    """ Extracting the name of the materials for the wingbox
+    :param sheet: Sheet from the input file
+    :param row_idx: Row index
+    :return:
+    """
+    column_idx = 1
+    material = ''
+
+    while cell(sheet, row_idx, column_idx) is not None:
+        material = material + '-' + str(cell(sheet, row_idx, column_idx))
+        column_idx = column_idx + 1
+
+    return material[1:]
+
+
+def parse_workbook(sheets):
+    """
+    Arranges the contents of the input sheets as the inputs of WingBoxAssessment.
+    :param sheets: output of read_workbook
+    :return: dict of inputs, list of [header, message] warnings
+    """
+    input_warnings = []
+
+    # Sheet 1
+    df_i = sheets[0]
+
+    # Section Geometry
+    root_chord = cell(df_i, 2, 1)
+    spans = [0] + appender(df_i, 6)
+    tapers = [1] + appender(df_i, 7)
+    sweeps = appender(df_i, 8)
+    dihedrals = appender(df_i, 9)
+    incidence = cell(df_i, 3, 1)
+    twist = [incidence] + appender(df_i, 10)
+
+    # Airfoil Placement
+    airfoil_names_unordered = [str(airfoil) if len(str(airfoil)) >= 4 else '00' + str(airfoil)
+                               for airfoil in appender(df_i, 19)]
+    airfoil_sections_unordered = appender(df_i, 20)
+
+    airfoil_names = [x for _, x in sorted(zip(airfoil_sections_unordered, airfoil_names_unordered))]
+    airfoil_sections = sorted(airfoil_sections_unordered)
+
+    # Sheet 2
+    df_i = sheets[1]
+
+    # Loading Cases
+    case_settings = [appender(df_i, 2), appender(df_i, 3), appender(df_i, 4)]
+    weight = cell(df_i, 6, 1)
+    speed = cell(df_i, 7, 1)
+    height = cell(df_i, 8, 1)
+
+    # Sheet 3
+    df_i = sheets[2]
+
+    # Structural Geometry
+    front_spar_loc = appender(df_i, 5)
+    rear_spar_loc = appender(df_i, 6)
+    rib_idx = appender(df_i, 7, True)
+
+    top_stringers = appender(df_i, 8, True)
+    bottom_stringers = appender(df_i, 9, True)
+
+    stringer_idx = []
+    if len(top_stringers) == len(bottom_stringers):  # Checking for coherence
+        stringer_idx = [[top_stringers[i], bottom_stringers[i]] for i in range(len(top_stringers))]
+
+    TE_skin_gap = cell(df_i, 11, 1)
+    TE_ribs_gap = cell(df_i, 12, 1)
+
+    secs = []
+    for i in range(3):
+        csi = appender(df_i, 15 + i)
+        label = 'dims' if len(csi) == 2 else 'moms' if len(csi) == 4 else ''
+        secs.append([csi, label])
+
+    mat_2D = [material_name(df_i, 31),   # skin
+              material_name(df_i, 27),   # spar web
+              material_name(df_i, 29)]   # rib web
+
+    mat_1D = [material_name(df_i, 32),   # stringers
+              material_name(df_i, 28),   # spar caps
+              material_name(df_i, 30)]   # rib caps
+
+    # Sheet 4
+    df_i = sheets[3]
+
+    # File paths.
+    nastran_path = cell(df_i, 6, 1)
+    bdf_file_folder = r"wingbox_code\bdf_files"
+    if cell(df_i, 7, 1) is not None:
+        bdf_file_folder = cell(df_i, 7, 1)
+
+    # Mesh Details
+    tc_select = cell(df_i, 8, 1)
+    min_elem_size = cell(df_i, 9, 1)
+    max_elem_size = cell(df_i, 10, 1)
+    quad_dominance = False
+
+    quad_input = cell(df_i, 11, 1)
+    if quad_input in ['Y', 'y']:
+        quad_dominance = True
+    elif quad_input not in ['N', 'n', None]:
+        msg = 'Input Y, N or leave empty for the quad dominance input to be valid.'
+        input_warnings.append(['Warning: Tri or Quad Dominance?', msg])
+
+    bcs = []
+    labels = ['root_rib', 'front_spar', 'rear_spar']
+    for i in range(3):
+        dof = ''
+        for j in range(6):
+            if cell(df_i, 14 + i, 1 + j) is not None:
+                dof = dof + str(j + 1)
+        bcs.append([labels[i], dof])
+
+    inputs = {'root_chord': root_chord,
+              'n_sections': len(sweeps),
+              'spans': spans,
+              'tapers': tapers,
+              'sweeps': sweeps,
+              'dihedrals': dihedrals,
+              'twist': twist,
+              'n_airfoils': len(airfoil_names),
+              'airfoil_sections': airfoil_sections,
+              'airfoil_names': airfoil_names,
+              'n_loads': len(case_settings[0]),
+              'case_settings': case_settings,
+              'weight': weight,
+              'speed': speed,
+              'height': height,
+              'rib_idx': rib_idx,
+              'front_spar_loc': front_spar_loc,
+              'rear_spar_loc': rear_spar_loc,
+              'stringer_idx': stringer_idx,
+              'TE_ribs_gap': TE_ribs_gap,
+              'TE_skin_gap': TE_skin_gap,
+              'secs': secs,
+              'mat_2D': mat_2D,
+              'mat_1D': mat_1D,
+              'nastran_path': nastran_path,
+              'bdf_file_folder': bdf_file_folder,
+              'min_elem_size': min_elem_size,
+              'max_elem_size': max_elem_size,
+              'tc_select': tc_select,
+              'quad_dominance': quad_dominance,
+              'bcs': bcs}
+
+    return inputs, input_warnings
+
+
+def check_types(inputs):
+    """
+    Checks the type of every input against INPUT_TYPES.
+    :param inputs: dict of inputs
+    :return: list of [header, message] warnings
+    """
+    type_warnings = []
+    for label, type_i in INPUT_TYPES.items():
+        value = inputs.get(label)
+        if isinstance(type_i, tuple) and type_i[0] is list:
+            values = value if isinstance(value, list) else [value]
+            type_i = type_i[1] if isinstance(value, list) else list
+        else:
+            values = [value]
+
+        if type_i is None:
+            continue
+
+        for value_i in values:
+            if isinstance(value_i, bool) and type_i is not bool:
+                valid = False
+            else:
+                valid = isinstance(value_i, type_i)
+            if not valid:
+                msg = 'Wrong input type for {}, correct type is {}'.format(label, type_i)
+                type_warnings.append(['Warning: Wrong Input Type', msg])
+                break
+
+    return type_warnings
+
+
+def workbook_hash(path):
+    """ SHA-256 of the contents of the workbook. """
+    sha = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def compile_snapshot(path):
+    """
+    Reads and parses the workbook into a snapshot dictionary.
+    :param path: path to the .xlsx file
+    :return: dict with the inputs and the warnings raised while reading them
+    """
+    inputs, input_warnings = parse_workbook(read_workbook(path))
+    return {'version': SNAPSHOT_VERSION,
+            'source': os.path.basename(path),
+            'hash': workbook_hash(path),
+            'inputs': inputs,
+            'warnings': input_warnings}
+
+
+def load_snapshot(path):
+    """ Loads a snapshot .json file. """
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def load_inputs(path='wingbox_user_inputs.xlsx', snapshot_dir=SNAPSHOT_DIR):
+    """
+    Returns the inputs of the workbook. The workbook is only parsed if there is no snapshot for its current
+    contents; otherwise, the snapshot is loaded without touching openpyxl.
+    :param path: path to the .xlsx file
+    :param snapshot_dir: folder where the snapshots are kept
+    :return: dict of inputs, list of [header, message] warnings
+    """
+    snapshot_path = os.path.join(snapshot_dir, workbook_hash(path) + '.json')
+
+    snapshot = None
+    if os.path.isfile(snapshot_path):
+        try:
+            snapshot = load_snapshot(snapshot_path)
+        except ValueError:
+            snapshot = None
+
+    if snapshot is None or snapshot.get('version') != SNAPSHOT_VERSION:
+        snapshot = compile_snapshot(path)
+        os.makedirs(snapshot_dir, exist_ok=True)
+        tmp_path = snapshot_path + '.{}.tmp'.format(os.getpid())
+        with open(tmp_path, 'w') as file:
+            json.dump(snapshot, file, indent=1)
+        os.replace(tmp_path, snapshot_path)
+
+    # Type mismatches are left to the model validators, as in the workbook reader, and only logged here
+    for _, msg in check_types(snapshot['inputs']):
+        warnings.warn(msg)
+
+    return snapshot['inputs'], snapshot['warnings']
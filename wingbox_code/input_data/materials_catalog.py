@@ -0,0 +1,165 @@
+import bisect
+import csv
+import os
+
+
+MATERIALS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'materials.csv')
+
+# Conversion constants from the imperial units of the .csv file to SI. Order follows the property columns.
+CSV_UNITS = [6.894757e6, 6.894757e6, 6.894757e6, 1, 515.378818, 6.894757e6, 6.894757e6, 6.894757e6]
+
+
+def split_material(mat_str):
+    """
+    Splits a material string 'alloy-temper-thickness-basis' into its key and its thickness in inches.
+    :param mat_str: material string, thickness in mm
+    :return: (alloy, temper, basis), thickness [in]
+    """
+    txt = mat_str.split('-')
+    if len(txt) != 4:
+        raise ValueError('Material string must have the shape alloy-temper-thickness-basis, '
+                         'got {}'.format(mat_str))
+    t = float(txt[2]) / 25.4  # Conversion to imperial units
+    return (txt[0], txt[1], txt[3]), t
+
+
+class ThicknessIndex:
+    """
+    Interval index over the (open) thickness ranges of a single alloy-temper-basis combination.
+    Ranges are sorted by their lower bound, so a lookup is a bisection instead of a linear scan.
+    """
+
+    def __init__(self):
+        self.t_min = []
+        self.t_max = []
+        self.props = []
+
+    def add(self, t_min, t_max, props):
+        idx = bisect.bisect_left(self.t_min, t_min)
+        self.t_min.insert(idx, t_min)
+        self.t_max.insert(idx, t_max)
+        self.props.insert(idx, props)
+
+    def find(self, t):
+        """ Returns the properties of the range that strictly contains t, or None. """
+        idx = bisect.bisect_left(self.t_min, t) - 1
+        if idx >= 0 and t < self.t_max[idx]:
+            return self.props[idx]
+        return None
+
+    @property
+    def limits(self):
+        return list(zip(self.t_min, self.t_max))
+
+
+class MaterialsCatalog:
+    """
+    In-memory materials database. Rows of the .csv file are indexed by (alloy, temper, basis), and each of
+    these keys holds an interval index on the thickness ranges. Properties are stored in SI units.
+    """
+
+    def __init__(self, path=MATERIALS_PATH):
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        self.index = {}
+        self.names = set()
+        self.tempers = set()
+        self.bases = set()
+        self.checked = {}
+
+        with open(path, 'r', newline='') as file:
+            mat_file = csv.reader(file)
+            header = next(mat_file)
+            self.header = header[6:len(header) - 1] + ['t']
+            for row in mat_file:
+                if not row:
+                    continue
+                key = (row[1], row[2], row[5])
+                props = [float(row[k]) * CSV_UNITS[k - 6] for k in range(6, len(row) - 1)]
+                self.index.setdefault(key, ThicknessIndex()).add(float(row[3]), float(row[4]), props)
+                self.names.add(row[1])
+                self.tempers.add(row[2])
+                self.bases.add(row[5])
+
+    def find(self, alloy, temper, basis, t):
+        """
+        Finds the mechanical properties of a material.
+        :param alloy: alloy name
+        :param temper: temper designation
+        :param basis: testing basis
+        :param t: thickness [in]
+        :return: dict of properties, or None if the combination does not exist
+        """
+        thickness_index = self.index.get((alloy, temper, basis))
+        if thickness_index is None:
+            return None
+
+        props = thickness_index.find(t)
+        if props is None:
+            return None
+
+        return dict(zip(self.header, props + [t]))
+
+    def props(self, mat_str):
+        """ Mechanical properties of a material string 'alloy-temper-thickness-basis'. """
+        key, t = split_material(mat_str)
+        return self.find(*key, t)
+
+    def check(self, mat_str):
+        """
+        Validates a material string against the database.
+        :param mat_str: material string 'alloy-temper-thickness-basis'
+        :return: bool, message
+        """
+        if mat_str not in self.checked:
+            self.checked[mat_str] = self._check(mat_str)
+        return self.checked[mat_str]
+
+    def _check(self, mat_str):
+        try:
+            (alloy, temper, basis), t = split_material(mat_str)
+        except ValueError:
+            msg = 'Material input must be written as A-B-C-D: name, temper, thickness and basis.'
+            return False, msg
+
+        if alloy not in self.names:
+            msg = 'Material Input A: Invalid material name. Choose one between {}.'.format(self.names)
+            return False, msg
+
+        if temper not in self.tempers:
+            msg = 'Material Input B:Invalid material temper. Choose one between {}.'.format(self.tempers)
+            return False, msg
+
+        if basis not in self.bases:
+            msg = 'Material Input D: Invalid material basis. Choose one between {}.'.format(self.bases)
+            return False, msg
+
+        if (alloy, temper, basis) not in self.index:
+            msg = 'Material input has not been found. Make sure that the combination of A-B-C-D inputs' \
+                  ' is feasible.'
+            return False, msg
+
+        if self.find(alloy, temper, basis, t) is None:
+            msg = 'Material Input C: Invalid material thickness. Make sure it is between the specified limits.'
+            return False, msg
+
+        return True, None
+
+
+_catalogs = {}
+
+
+def get_catalog(path=MATERIALS_PATH):
+    """
+    Returns the catalog of the given .csv file. It is loaded once per process and only reloaded when the
+    modification time of the file changes.
+    :param path: path to the materials .csv file
+    :return: MaterialsCatalog
+    """
+    path = os.path.abspath(path)
+    catalog = _catalogs.get(path)
+    if catalog is None or catalog.mtime != os.path.getmtime(path):
+        catalog = MaterialsCatalog(path)
+        _catalogs[path] = catalog
+
+    return catalog
@@ -1,38 +1,109 @@
-from random import random
+import numpy as np
 from parapy.core import *
 from parapy.geom import *
-from parapy.lib.fem.future.mesh.visualization import DeformedGrid
+from OCC.wrapper.BRep import BRep_Builder
+from OCC.wrapper.BRepBuilderAPI import BRepBuilderAPI_MakeFace, BRepBuilderAPI_MakePolygon
+from OCC.wrapper.TopoDS import TopoDS_Compound
+from OCC.wrapper.gp import gp_Pnt
+from ..analysis_tools.mesh_cache import ELEMENT_CARDS
 
 
 class Colormap(GeomBase):
+    """ Deformed mesh of each subcase, built from the mesh arrays the .bdf file was written from (FEMFile.mesh_arrays),
+    so the displacement node ids match and no remeshing is needed. """
 
-    mesh = Input()
+    arrays = Input()
     dictn = Input()
     magnification_factor = Input()
+    n_colors = Input(8)
 
     @Attribute
     def get_vectors(self):
+        """ Displacements per subcase, one row per node of the mesh arrays """
+        rows = {int(node_id): i for i, node_id in enumerate(self.arrays['node_ids'])}
 
-        disp_dicts = []
+        disp_arrays = []
         for key in self.dictn.keys():
-            lst = self.dictn[key]
-            node_id_to_vector = dict()
-            for node in lst:
-                node_id_to_vector[node[0]] = Vector(float(node[1]), float(node[2]), float(node[3]))
-            disp_dicts.append(node_id_to_vector)
+            vectors = np.zeros(self.arrays['coords'].shape)
+            for node in self.dictn[key]:
+                row = rows.get(int(float(node[0])))
+                if row is not None:
+                    vectors[row] = [float(node[1]), float(node[2]), float(node[3])]
+            disp_arrays.append(vectors)
 
-        return disp_dicts
+        return disp_arrays
+
+    @Attribute
+    def elements(self):
+        """ Element connectivity as rows of the mesh arrays, per element type """
+        order = np.argsort(self.arrays['node_ids'])
+        sorted_ids = self.arrays['node_ids'][order]
+        return [order[np.searchsorted(sorted_ids, self.arrays[card][1])] for card in ELEMENT_CARDS]
 
     @Part
     def displacements(self):
-        return DeformedGrid(quantify=len(self.get_vectors),
-                            SMESH_Mesh=self.mesh.SMESH_Mesh,
+        return DeformedMesh(quantify=len(self.get_vectors),
+                            coords=self.arrays['coords'],
+                            elements=self.elements,
                             vectors=self.get_vectors[child.index],
                             magnify=self.magnification_factor,
-                            colors=((0, 0, 255), (255, 0, 0)))
+                            n_colors=self.n_colors)
+
+
+class DeformedMesh(GeomBase):
+    """ Deformed mesh, with the elements grouped in n_colors bands of displacement magnitude from blue to red """
+
+    coords = Input()
+    elements = Input()
+    vectors = Input()
+    magnify = Input()
+    n_colors = Input()
+
+    @Attribute
+    def bands(self):
+        magnitude = np.linalg.norm(self.vectors, axis=1)
+        top = magnitude.max() if len(magnitude) and magnitude.max() > 0. else 1.
+
+        bands = [[] for _ in range(self.n_colors)]
+        for connectivity in self.elements:
+            element_magnitude = magnitude[connectivity].mean(axis=1) if len(connectivity) else []
+            band_idx = np.minimum((np.asarray(element_magnitude) / top * self.n_colors).astype(int), self.n_colors - 1)
+            for band, element in zip(band_idx, connectivity):
+                bands[band].append(element)
+        return bands
+
+    @Attribute
+    def deformed_coords(self):
+        return self.coords + self.magnify * self.vectors
+
+    @Part
+    def bands_view(self):
+        return ElementFaces(quantify=self.n_colors,
+                            coords=self.deformed_coords,
+                            elements=self.bands[child.index],
+                            color=(int(255 * child.index / max(self.n_colors - 1, 1)), 0,
+                                   int(255 * (1 - child.index / max(self.n_colors - 1, 1)))))
+
+
+class ElementFaces(Compound):
+    """ Compound of planar faces, one per element, built straight from node coordinates """
+
+    coords = Input()
+    elements = Input()
+    built_from = Input(None)  # Not used, the shape comes from coords and elements
 
+    def build(self):
+        builder = BRep_Builder()
+        compound = TopoDS_Compound()
+        builder.MakeCompound(compound)
 
-if __name__ == '__main__':
-    from parapy.gui import display
-    display(Colormap)
+        for element in self.elements:
+            polygon = BRepBuilderAPI_MakePolygon()
+            for row in element:
+                polygon.Add(gp_Pnt(*(float(value) for value in self.coords[row])))
+            polygon.Close()
+            face = BRepBuilderAPI_MakeFace(polygon.Wire(), True)
+            if face.IsDone():
+                builder.Add(compound, face.Face())
+        return compound
 
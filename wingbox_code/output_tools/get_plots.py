@@ -1,8 +1,9 @@
-import matplotlib.pyplot as plt
 import os
 
 
 def get_plots(load_cases):
+    import matplotlib.pyplot as plt
+
     for idx, case in enumerate(load_cases):
         ids = ['L', 'D', 'M']
         L_vec = [load[0] for load in case.forces_moms]
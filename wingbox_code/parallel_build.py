@@ -0,0 +1,76 @@
+"""
+Parallel build of the wingbox components. The wing loft and its sections are built and cached once, then the skin,
+spars, ribs and stringers are built across a process pool. Workers ship the shapes back as BREP data, which is stored
+in the shape cache, so the model picks them up as ordinary (cached) parts of WingBox.STEP_node_list.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def build_nodes(inputs, indices):
+    """
+    Builds some of the wingbox components in a fresh model. Runs in a worker process; the wing loft and its
+    sections are read from the shape cache.
+    :param inputs: dict of WingBoxAssessment inputs
+    :param indices: indices in WingBox.STEP_node_list of the components to build
+    :return: list of (index, BREP data)
+    """
+    from .geometry.geometry_tools.shape_cache import brep_bytes
+    from .runner import build_model
+
+    model = build_model(inputs)
+    # Components are built one by one, so a worker only builds the cutters and scaffolding its components need
+    return [(k, brep_bytes(model.wingbox.built_node(k).TopoDS_Shape)) for k in indices]
+
+
+def missing_nodes(model):
+    """ Indices of the wingbox components that are not in the shape cache yet. The components are counted from the
+    rib and stringer counts (WingBox.node_paths), so nothing is built in the calling process. """
+    from .geometry.geometry_tools.shape_cache import brep_path
+
+    key = model.wingbox.shape_key
+    return [k for k in range(len(model.wingbox.node_labels))
+            if not os.path.isfile(brep_path(key, 'node_{}'.format(k)))]
+
+
+def prebuild_wingbox(model, inputs, workers=None, verbose=True):
+    """
+    Builds the wingbox components of a model across a process pool and stores them in the shape cache.
+    On Windows, call it from a 'if __name__ == "__main__":' block.
+    :param model: WingBoxAssessment built from inputs
+    :param inputs: dict of WingBoxAssessment inputs
+    :param workers: number of worker processes, defaults to the number of CPUs
+    :param verbose: print the build summary
+    :return: number of components built
+    """
+    from .geometry.geometry_tools.shape_cache import brep_path, write_brep_bytes
+
+    if not model.shape_cache:
+        raise ValueError('The parallel build ships its shapes through the shape cache, set shape_cache=True.')
+
+    start = time.perf_counter()
+
+    # The loft and its sections are serialized once, so that the workers do not rebuild them.
+    model.wing_geom.right_wing.TopoDS_Shape
+    for section in model.wing_geom.surf_section:
+        section.TopoDS_Shape
+
+    todo = missing_nodes(model)
+    if not todo:
+        return 0
+
+    workers = min(workers or os.cpu_count() or 1, len(todo))
+    # Round-robin split, so that every worker gets a mix of cheap and expensive components.
+    chunks = [todo[w::workers] for w in range(workers)]
+
+    key = model.wingbox.shape_key
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(build_nodes, [inputs]*workers, chunks):
+            for k, data in result:
+                write_brep_bytes(data, brep_path(key, 'node_{}'.format(k)))
+
+    if verbose:
+        print('Built {} wingbox components on {} processes in {:.3f} s'.format(len(todo), workers,
+                                                                               time.perf_counter() - start))
+    return len(todo)
@@ -0,0 +1,132 @@
+"""
+Opt-in profiler of the ParaPy slots (@Attribute, @Part, @Input) evaluated in a run of the model tree.
+
+    with SlotProfiler() as profiler:
+        run_stages(inputs, ['geometry', 'wingbox', 'mesh'])
+    print(profiler.report(limit=20))
+    profiler.write_folded('wingbox.folded')
+
+Slots are evaluated lazily, so a slot evaluation is nested in the evaluation of the slots that requested it. The
+folded stacks follow that nesting and can be rendered with flamegraph.pl or speedscope. Work done inside compiled
+code (e.g. the OCC operations of parapy.geom) is attributed to the Python slot that triggered it.
+"""
+import sys
+import time
+from collections import defaultdict
+import psutil
+from parapy.core import Attribute, Base, Input, Part
+
+
+def _getter_codes(slot):
+    """ Code objects of the getter functions wrapped by a slot descriptor. Validators registered on the slot take the
+    value as a second argument and are left out, so their calls are not counted as slot evaluations. """
+    values = list(vars(slot).values()) if hasattr(slot, '__dict__') else []
+    for cls in type(slot).__mro__:
+        for name in cls.__dict__.get('__slots__', ()):
+            values.append(getattr(slot, name, None))
+    return {value.__code__ for value in values
+            if hasattr(value, '__code__') and value.__code__.co_argcount == 1}
+
+
+class SlotProfiler:
+
+    def __init__(self, memory=True):
+        """
+        :param memory: record the change in resident memory of each slot evaluation, at some extra overhead
+        """
+        self.memory = memory
+        self.stats = defaultdict(lambda: {'calls': 0, 'total': 0.0, 'self': 0.0, 'memory': 0})
+        self.folded = defaultdict(float)
+        self._labels = {}
+        self._stack = []
+        self._active = defaultdict(int)
+        self._process = psutil.Process()
+        self._previous = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        self._previous = sys.getprofile()
+        sys.setprofile(self._profile)
+
+    def stop(self):
+        sys.setprofile(self._previous)
+        self._stack = []
+        self._active.clear()
+
+    def _rss(self):
+        return self._process.memory_info().rss if self.memory else 0
+
+    def _label(self, frame):
+        """ 'Class.slot' if the frame evaluates a ParaPy slot, None otherwise. Cached per code object. """
+        code = frame.f_code
+        if code in self._labels:
+            return self._labels[code]
+
+        label = None
+        if code.co_argcount == 1 and code.co_varnames[0] == 'self':
+            obj = frame.f_locals.get('self')
+            if isinstance(obj, Base):
+                for cls in type(obj).__mro__:
+                    slot = cls.__dict__.get(code.co_name)
+                    if isinstance(slot, (Attribute, Part, Input)) and code in _getter_codes(slot):
+                        label = '{}.{}'.format(cls.__name__, code.co_name)
+                        break
+        self._labels[code] = label
+        return label
+
+    def _profile(self, frame, event, arg):
+        if event == 'call':
+            label = self._label(frame)
+            if label is not None:
+                self._stack.append([label, frame, time.perf_counter(), 0.0, self._rss()])
+                self._active[label] += 1
+
+        elif event == 'return' and self._stack and self._stack[-1][1] is frame:
+            label, _, start, children, rss = self._stack.pop()
+            elapsed = time.perf_counter() - start
+            stats = self.stats[label]
+            stats['calls'] += 1
+            stats['self'] += elapsed - children
+
+            # Recursive evaluations of a slot are only counted once in its total
+            self._active[label] -= 1
+            if not self._active[label]:
+                stats['total'] += elapsed
+                stats['memory'] += self._rss() - rss
+
+            self.folded[';'.join([entry[0] for entry in self._stack] + [label])] += elapsed - children
+            if self._stack:
+                self._stack[-1][3] += elapsed
+
+    def report(self, sort='total', limit=None):
+        """
+        Text report of the slot evaluations
+        :param sort: 'total', 'self', 'calls' or 'memory'
+        :param limit: number of slots to list, all if None
+        :return: report as a string
+        """
+        rows = sorted(self.stats.items(), key=lambda item: item[1][sort], reverse=True)[:limit]
+        width = max([len(label) for label, _ in rows] + [4])
+        lines = ['{:<{w}}  {:>8}  {:>10}  {:>10}  {:>10}'.format('slot', 'calls', 'total [s]', 'self [s]',
+                                                               'mem [MB]', w=width)]
+        for label, stats in rows:
+            lines.append('{:<{w}}  {:>8d}  {:>10.3f}  {:>10.3f}  {:>10.1f}'.format(label, stats['calls'],
+                                                                                stats['total'], stats['self'],
+                                                                                stats['memory']/2**20, w=width))
+        return '\n'.join(lines)
+
+    def write_report(self, path, sort='total'):
+        with open(path, 'w') as file:
+            file.write(self.report(sort) + '\n')
+
+    def write_folded(self, path):
+        """ Folded stacks ('parent;child value' lines) with the self time of each stack, in microseconds """
+        with open(path, 'w') as file:
+            for stack, seconds in sorted(self.folded.items()):
+                file.write('{} {}\n'.format(stack, max(int(round(seconds*1e6)), 0)))
@@ -0,0 +1,130 @@
+import json
+import os
+import time
+from .format.input_validation import validate_inputs
+
+
+# Stages of a headless run, in execution order.
+STAGES = ['geometry', 'avl', 'wingbox', 'mesh', 'bdf', 'solve', 'post']
+
+
+def load_run_inputs(path):
+    """
+    Loads the inputs of a run, either from an input snapshot (.json) or from the input workbook (.xlsx).
+    :param path: path to the snapshot or workbook
+    :return: dict of inputs, list of [header, message] warnings
+    """
+    if path.lower().endswith('.json'):
+        with open(path, 'r') as file:
+            snapshot = json.load(file)
+        return snapshot['inputs'], snapshot.get('warnings', [])
+
+    from .input_data.input_snapshot import load_inputs
+    return load_inputs(path)
+
+
+def stage_geometry(model, context):
+    return {'wing_faces': len(model.wing_geom.right_wing.faces)}
+
+
+def stage_avl(model, context):
+    return {'avl_cases': len(model.analysis.results)}
+
+
+def stage_wingbox(model, context):
+    if context.get('workers', 1) > 1 and model.shape_cache:
+        from .parallel_build import prebuild_wingbox
+        prebuild_wingbox(model, context['inputs'], context['workers'], verbose=False)
+    return {'wingbox_parts': len(model.wingbox.STEP_node_list)}
+
+
+def stage_mesh(model, context):
+    arrays = model.FEMFile.mesh_arrays
+    return {'nodes': len(arrays['node_ids']),
+            'elements': len(arrays['CTRIA3'][0]) + len(arrays['CQUAD4'][0])}
+
+
+def stage_bdf(model, context):
+    context['bdf_path'] = model.write_bdf()
+    return {'bdf_path': context['bdf_path']}
+
+
+def stage_solve(model, context):
+    bdf_path = context.get('bdf_path') or os.path.abspath(os.path.join(model.bdf_file_folder,
+                                                                       'wingbox_bulkdata.bdf'))
+    model.run_nastran(bdf_path)
+    return {}
+
+
+def stage_post(model, context):
+    model.post_process()
+    return {}
+
+
+STAGE_FUNCTIONS = {'geometry': stage_geometry,
+                   'avl': stage_avl,
+                   'wingbox': stage_wingbox,
+                   'mesh': stage_mesh,
+                   'bdf': stage_bdf,
+                   'solve': stage_solve,
+                   'post': stage_post}
+
+
+def build_model(inputs):
+    """ Instantiates the WingBoxAssessment model. Nothing is computed until a stage requests it. """
+    from .wingbox_assessment import WingBoxAssessment
+    return WingBoxAssessment(**inputs)
+
+
+def check_run_inputs(inputs, stages=STAGES):
+    """
+    Validates the inputs of a run in a single pass. File paths are only checked if a stage uses them.
+    :param inputs: dict of WingBoxAssessment inputs
+    :param stages: list of stage names
+    :return: None, raises ValueError listing every error
+    """
+    skip = []
+    if 'bdf' not in stages:
+        skip.append('bdf_file_folder')
+    if 'solve' not in stages:
+        skip.append('nastran_path')
+
+    errors = validate_inputs(inputs, skip)
+    if errors:
+        raise ValueError('Invalid inputs:\n' + '\n'.join('  {}: {}'.format(label, msg) for label, msg in errors))
+
+
+def run_stages(inputs, stages=STAGES, verbose=True, workers=1):
+    """
+    Builds the model and evaluates only the requested stages, in their natural order.
+    :param inputs: dict of WingBoxAssessment inputs
+    :param stages: list of stage names, see STAGES
+    :param verbose: print the wall time of each stage
+    :param workers: processes used to build the wingbox components (needs the shape cache)
+    :return: model, dict of stage results, dict of wall times [s]
+    """
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        raise ValueError('Unknown stages {}. Choose between {}.'.format(unknown, STAGES))
+
+    check_run_inputs(inputs, stages)
+
+    timings = {}
+    results = {}
+    context = {'inputs': inputs, 'workers': workers}
+
+    start = time.perf_counter()
+    model = build_model(inputs)
+    timings['setup'] = time.perf_counter() - start
+
+    for stage in [stage for stage in STAGES if stage in stages]:
+        start = time.perf_counter()
+        results[stage] = STAGE_FUNCTIONS[stage](model, context)
+        timings[stage] = time.perf_counter() - start
+        if verbose:
+            print('{:<10}{:>10.3f} s  {}'.format(stage, timings[stage], results[stage] or ''))
+
+    if verbose:
+        print('{:<10}{:>10.3f} s'.format('total', sum(timings.values())))
+
+    return model, results, timings
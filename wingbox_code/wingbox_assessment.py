@@ -3,12 +3,17 @@ from parapy.geom import *
 from parapy.core.validate import *
 from .geometry.geometry_tools.winggeom import WingGeom
 from .geometry.wingbox import WingBox
+from .geometry.geometry_tools.lod import DEFAULT_LOD, LOD_PROFILES, deflection
 from .analysis_tools.avl_analysis import AvlAnalysis
-from .format.tk_warn import type_warning, material_validation
-from .analysis_tools.femfilegenerator import FEMFileGenerator
+from .format.input_validation import (check_spans, check_tapers, check_sweeps, check_dihedrals, check_twist,
+                                      check_airfoil_sections, check_airfoil_names, check_case_settings,
+                                      check_rib_idx, check_front_spar_loc, check_rear_spar_loc, check_stringer_idx,
+                                      check_te_skin_gap, check_te_ribs_gap, check_materials, check_nastran_path,
+                                      check_bdf_file_folder, check_min_elem_size, check_secs, check_bcs,
+                                      check_output_requests)
+from .analysis_tools.femfilegenerator import DEFAULT_OUTPUTS, FEMFileGenerator, mat_props_finder, sec_props_finder
 from .output_tools.get_plots import get_plots
 from .output_tools.get_reactions import get_reactions
-from .output_tools.colormap_results import Colormap
 from .output_tools.punch_interpreter import read_punch, punch_interpreter
 import os
 import shutil
@@ -31,39 +36,6 @@ def check_nastran_running():
     return False
 
 
-def bdf_file_cases(file_path, case_settings):
-    """ Adds the subcases to be run by NASTRAN in the BDF file. """
-
-    search_line = 'ECHO = NONE'
-    commands = ["SUBCASE ",
-                "    LOAD = ",
-                "    SPC = ",
-                "    DISP = ALL",
-                "    DISPLACEMENT(SORT1,REAL,PUNCH)=ALL",
-                "    SPCFORCES(SORT1,REAL)=ALL",
-                "    STRESS(SORT1,REAL,VONMISES,BILIN,PUNCH)=ALL",
-                "    STRAIN(SORT1,REAL,VONMISES,BILIN,PUNCH)=ALL"]
-
-    with open(file_path, 'r+') as file:
-        content = file.read()  # Read the entire content into a variable
-        file.seek(0)  # Move the file pointer to the beginning
-        file.truncate()  # Clear the file content
-
-        for line in content.splitlines():
-            file.write(line + '\n')  # Write the original line back
-
-            if search_line in line:
-                for k in range(len(case_settings)):
-                    var = ''
-                    if 0 <= k < 3:
-                        var = str(k + 1)
-                    for i, command in enumerate(commands):
-                        if i < 3:
-                            file.write(command + var + '\n')
-                        else:
-                            file.write(command + '\n')
-
-
 class WingBoxAssessment(GeomBase):
     """
     Create a wing model with multiple sections and airfoils. Further, create its corresponding wingbox. These
@@ -141,6 +113,16 @@ class WingBoxAssessment(GeomBase):
     # BCs
     bcs = Input(validator=IsInstance(list))
 
+    # NASTRAN output requests: one list for all subcases, or one list per subcase
+    output_requests = Input(DEFAULT_OUTPUTS, validator=IsInstance(list))
+
+    # Reuse the wing and wingbox shapes of previous runs with the same geometric inputs
+    shape_cache = Input(True, validator=IsInstance(bool))
+
+    # Tessellation level of detail of the views: 'preview', 'presentation' or 'export'. The geometry does not
+    # depend on it, so switching profile only re-tessellates the views.
+    lod = Input(DEFAULT_LOD, validator=OneOf(list(LOD_PROFILES)))
+
     # SPECIAL VALIDATORS #
 
 
@@ -152,31 +134,7 @@ class WingBoxAssessment(GeomBase):
         :param span:
         :return: bool
         """
-        if len(span) != self.n_sections + 1:
-            msg = 'The number of section spans must be coherent with the number of sections.' \
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        if 0 not in span:
-            msg = 'The "0" span station must be kept unchanged'
-            return False, msg
-
-        for i in range(1, len(span[1:])):
-            warn, msg = type_warning(span[i], 'span', (int, float))
-            if not warn:
-                return False, msg
-
-            if span[i] <= 0:
-                msg = 'The section spans cannot be negative or equal to zero. Change section {}'.format(i)
-                return False, msg
-            if span[i] == span[i-1]:
-                msg = 'Two sections cannot be defined at the same span length. Change section {}'.format(i)
-                return False, msg
-            if span[i] < span[i-1]:
-                msg = 'The sections must be organized in ascending order. Change section {}'.format(i)
-                return False, msg
-
-        return True
+        return check_spans(span, self.n_sections)
 
     @tapers.validator
     def tapers(self, taper):
@@ -185,21 +143,7 @@ class WingBoxAssessment(GeomBase):
         :param taper:
         :return: bool
         """
-        if len(taper) != self.n_sections + 1:
-            msg = 'The number of section tapers must be coherent with the number of sections.'\
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for i in range(len(taper)):
-            warn, msg = type_warning(taper[i], 'taper', (int, float))
-            if not warn:
-                return False, msg
-
-            if taper[i] <= 0:
-                msg = 'The section taper cannot be negative or equal to zero. Change section {}'.format(i)
-                return False, msg
-
-        return True
+        return check_tapers(taper, self.n_sections)
 
     @sweeps.validator
     def sweeps(self, sweep):
@@ -208,21 +152,7 @@ class WingBoxAssessment(GeomBase):
         :param sweep:
         :return:
         """
-        if len(sweep) != self.n_sections:
-            msg = 'The number of section sweeps must be coherent with the number of sections.'\
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for i in range(len(sweep)):
-            warn, msg = type_warning(sweep[i], 'sweep', (int, float))
-            if not warn:
-                return False, msg
-
-            if sweep[i] < -85 or sweep[i] > 85:
-                msg = 'The sweep value must be kept in the range [-85, 85] degrees. Change section {}'.format(i)
-                return False, msg
-
-        return True
+        return check_sweeps(sweep, self.n_sections)
 
     @dihedrals.validator
     def dihedrals(self, dihedral):
@@ -231,21 +161,7 @@ class WingBoxAssessment(GeomBase):
         :param dihedral:
         :return:
         """
-        if len(dihedral) != self.n_sections:
-            msg = 'The number of section dihedrals must be coherent with the number of sections.'\
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for i in range(len(dihedral)):
-            warn, msg = type_warning(dihedral[i], 'dihedral', (int, float))
-            if not warn:
-                return False, msg
-
-            if dihedral[i] < -85 or dihedral[i] > 85:
-                msg = 'The sweep value must be kept in the range [-85, 85] degrees. Change section {}'.format(i)
-                return False, msg
-
-        return True
+        return check_dihedrals(dihedral, self.n_sections)
 
     @twist.validator
     def twist(self, twists):
@@ -254,20 +170,7 @@ class WingBoxAssessment(GeomBase):
         :param twists:
         :return:
         """
-        if len(twists) != self.n_sections + 1:
-            msg = 'The number of section twists must be coherent with the number of sections.'\
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for i in range(len(twists)):
-            warn, msg = type_warning(twists[i], 'twist', (int, float))
-            if not warn:
-                return False, msg
-            if twists[i] < -85 or twists[i] > 85:
-                msg = 'The sweep value must be kept in the range [-85, 85] degrees. Change section {}'.format(i)
-                return False, msg
-
-        return True
+        return check_twist(twists, self.n_sections)
 
     @airfoil_sections.validator
     def airfoil_sections(self, sections):
@@ -276,34 +179,7 @@ class WingBoxAssessment(GeomBase):
         :param sections:
         :return:
         """
-        if len(sections) != self.n_airfoils:
-            msg = 'The number of airfoil locations must be coherent with the number of airfoils.'\
-                  ' If you want to add/remove sections, change n_airfoils'
-            return False, msg
-
-        if (0 or 1) not in sections:
-            msg = 'Either no tip or no root airfoil was input'
-            return False, msg
-
-        for i in range(1, len(sections[1:])):
-            warn, msg = type_warning(sections[i], 'airfoil sections', (int, float))
-            if not warn:
-                return False, msg
-            if sections[i] <= 0:
-                msg = 'The airfoil span sections cannot be negative or equal to zero.' \
-                      'Change airfoil location {}'.format(i)
-                return False, msg
-            if sections[i] == sections[i - 1]:
-                msg = 'Two airfoils cannot be defined at the same span length. Change airfoil location {}'.format(i)
-                return False, msg
-            if sections[i] < sections[i - 1]:
-                msg = 'The airfoils must be organized in ascending order. Change airfoil location {}'.format(i)
-                return False, msg
-            if sections[i] > 1 or sections[i] < 0:
-                msg = 'The airfoil location cannot be located outside of the span. Change airfoil location {}'.format(i)
-                return False, msg
-
-        return True
+        return check_airfoil_sections(sections, self.n_airfoils)
 
     @airfoil_names.validator
     def airfoil_names(self, names):
@@ -313,25 +189,7 @@ class WingBoxAssessment(GeomBase):
         :param names:
         :return:
         """
-
-        name_database_dat = os.listdir(r'wingbox_code\input_data\airfoils')
-        name_database = [name.split('.')[0] for name in name_database_dat]
-
-        if len(names) != self.n_airfoils:
-            msg = 'The number of airfoil names must be coherent with the number of airfoils.'\
-                  ' If you want to add/remove sections, change n_airfoils'
-            return False, msg
-
-        for i in range(len(names)):
-            warn, msg = type_warning(names[i], 'airfoil names', str)
-            if not warn:
-                return False, msg
-
-            if (names[i] not in name_database) and not (len(names[i]) == 4 or len(names[i]) == 5):
-                msg = 'Invalid airfoil name. Make sure the name is correctly written or contains either 4 or 5 digits.'
-                return False, msg
-
-        return True
+        return check_airfoil_names(names, self.n_airfoils)
 
     @case_settings.validator
     def case_settings(self, cases):
@@ -340,29 +198,7 @@ class WingBoxAssessment(GeomBase):
         :param cases:
         :return:
         """
-
-        for i in cases:
-            if len(i) != self.n_loads:
-                msg = 'The number of load cases must be coherent.' \
-                      ' If you want to add/remove load cases, change n_loads'
-                return False, msg
-
-        for i in cases[0]:
-            warn, msg = type_warning(i, 'load case names', str)
-            if not warn:
-                return False, msg
-
-        for i in cases[1]:
-            if i != 'alpha' and i != 'CL':
-                msg = 'Invalid load case variable name. Please use either "alpha" or "CL"'
-                return False, msg
-
-        for i in cases[2]:
-            warn, msg = type_warning(i, 'load case variable value', (float, int))
-            if not warn:
-                return False, msg
-
-        return True
+        return check_case_settings(cases, self.n_loads)
 
     @rib_idx.validator
     def rib_idx(self, ribs):
@@ -371,21 +207,7 @@ class WingBoxAssessment(GeomBase):
         :param ribs:
         :return:
         """
-        if len(ribs) != self.n_sections:
-            msg = 'The number of section ribs must be coherent with the number of sections.'\
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for rib in ribs:
-            warn, msg = type_warning(rib, 'rib number', int)
-            if not warn:
-                return False, msg
-
-            if rib <= 0:
-                msg = 'The amount of ribs must at least be 1 for every section'
-                return False, msg
-
-        return True
+        return check_rib_idx(ribs, self.n_sections)
 
     @front_spar_loc.validator
     def front_spar_loc(self, fs_locs):
@@ -395,26 +217,7 @@ class WingBoxAssessment(GeomBase):
         :param fs_locs:
         :return:
         """
-
-        if len(fs_locs) != self.n_sections + 1:
-            msg = 'The number of section front spar locations must be coherent with the number of sections.'\
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for i in range(len(fs_locs)):
-            warn, msg = type_warning(fs_locs[i], 'front spar location', float)
-            if not warn:
-                return False, msg
-
-            if fs_locs[i] <= 0 or fs_locs[i] >= 1:
-                msg = 'Front spar locations must be limited between 0 and 1 to stay within the chord'
-                return False, msg
-
-            if fs_locs[i] >= self.rear_spar_loc[i]:
-                msg = 'The front spar cannot be further aft than the rear spar'
-                return False, msg
-
-        return True
+        return check_front_spar_loc(fs_locs, self.n_sections, self.rear_spar_loc)
 
     @rear_spar_loc.validator
     def rear_spar_loc(self, rs_locs):
@@ -424,26 +227,7 @@ class WingBoxAssessment(GeomBase):
         :param rs_locs:
         :return:
         """
-
-        if len(rs_locs) != self.n_sections + 1:
-            msg = 'The number of section rear spar locations must be coherent with the number of sections.'\
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for i in range(len(rs_locs)):
-            warn, msg = type_warning(rs_locs[i], 'rear spar location', float)
-            if not warn:
-                return False, msg
-
-            if rs_locs[i] <= 0 or rs_locs[i] >= 1:
-                msg = 'Rear spar locations must be limited between 0 and 1 to stay within the chord'
-                return False, msg
-
-            # if rs_locs[i] <= self.front_spar_loc[i]:
-            #     msg = 'The rear spar cannot be further front than the front spar'
-            #     return False, msg
-
-        return True
+        return check_rear_spar_loc(rs_locs, self.n_sections)
 
     @stringer_idx.validator
     def stringer_idx(self, stringers):
@@ -452,21 +236,7 @@ class WingBoxAssessment(GeomBase):
         :param stringers:
         :return:
         """
-        if len(stringers) != self.n_sections:
-            msg = 'The number of section stringers must be coherent with the number of sections.'\
-                  ' If you want to add/remove sections, change n_sections.'
-            return False, msg
-
-        for section in stringers:
-            for num_stringer in section:
-                warn, msg = type_warning(num_stringer, 'stringer', int)
-                if not warn:
-                    return False, msg
-            if len(section) != 2:
-                msg = 'Wrong number of inputs. The list must have two inputs per section: top and bottom stringers.'
-                return False, msg
-
-        return True
+        return check_stringer_idx(stringers, self.n_sections)
 
     @TE_skin_gap.validator
     def TE_skin_gap(self, value):
@@ -475,15 +245,7 @@ class WingBoxAssessment(GeomBase):
         :param value:
         :return:
         """
-        for i in range(self.n_sections + 1):
-            if value < self.rear_spar_loc[i]:
-                msg = 'The skin cut location cannot be located further front than the aft spar.'
-                return False, msg
-            if value > 0.98:
-                msg = 'The skin cut location cannot be located more than 98% of the chord'
-                return False, msg
-
-        return True
+        return check_te_skin_gap(value, self.rear_spar_loc)
 
     @TE_ribs_gap.validator
     def TE_ribs_gap(self, value):
@@ -492,15 +254,7 @@ class WingBoxAssessment(GeomBase):
         :param value:
         :return:
         """
-        for i in range(self.n_sections + 1):
-            if value < self.rear_spar_loc[i]:
-                msg = 'The rib cut location cannot be located further front than the aft spar.'
-                return False, msg
-            if value > 0.98:
-                msg = 'The rib cut location cannot be located more than 98% of the chord'
-                return False, msg
-
-        return True
+        return check_te_ribs_gap(value, self.rear_spar_loc)
 
     @mat_1D.validator
     def mat_1D(self, materials):
@@ -509,42 +263,7 @@ class WingBoxAssessment(GeomBase):
         :param materials:
         :return:
         """
-        for material in materials:
-            warn, msg = type_warning(material, 'material', str)
-            if not warn:
-                return False, msg
-
-            names, temper, basis, partial_names, thicknesses = material_validation()
-            txt = material.split('-')
-            t = float(txt[2]) / 25.4  # Conversion to imperial units
-            txt.pop(2)
-            material_partial = '-'.join(txt)
-
-            if txt[0] not in names:
-                msg = 'Material Input A: Invalid material name. Choose one between {}.'.format(set(names))
-                return False, msg
-
-            if txt[1] not in temper:
-                msg = 'Material Input B:Invalid material temper. Choose one between {}.'.format(set(temper))
-                return False, msg
-
-            if txt[2] not in basis:
-                msg = 'Material Input D: Invalid material basis. Choose one between {}.'.format(set(basis))
-                return False, msg
-
-            if material_partial not in partial_names:
-                msg = 'Material input has not been found. Make sure that the combination of A-B-C-D inputs' \
-                      ' is feasible.'
-                return False, msg
-
-            for i in range(len(partial_names)):
-                if material_partial == partial_names[i] and thicknesses[i][0] < t < thicknesses[i][1]:
-                    return True
-
-            msg = 'Material Input C: Invalid material thickness. Make sure it is between the specified limits.'
-            return False, msg
-
-        return
+        return check_materials(materials)
 
     @mat_2D.validator
     def mat_2D(self, materials):
@@ -553,52 +272,12 @@ class WingBoxAssessment(GeomBase):
         :param materials:
         :return:
         """
-        for material in materials:
-            warn, msg = type_warning(material, 'material', str)
-            if not warn:
-                return False, msg
-
-            names, temper, basis, partial_names, thicknesses = material_validation()
-            txt = material.split('-')
-            t = float(txt[2]) / 25.4  # Conversion to imperial units
-            txt.pop(2)
-            material_partial = '-'.join(txt)
-
-            if txt[0] not in names:
-                msg = 'Material Input A: Invalid material name. Choose one between {}.'.format(set(names))
-                return False, msg
-
-            if txt[1] not in temper:
-                msg = 'Material Input B:Invalid material temper. Choose one between {}.'.format(set(temper))
-                return False, msg
-
-            if txt[2] not in basis:
-                msg = 'Material Input D: Invalid material basis. Choose one between {}.'.format(set(basis))
-                return False, msg
-
-            if material_partial not in partial_names:
-                msg = 'Material input has not been found. Make sure that the combination of A-B-C-D inputs' \
-                      ' is feasible.'
-                return False, msg
-
-            for i in range(len(partial_names)):
-                if material_partial == partial_names[i] and thicknesses[i][0] < t < thicknesses[i][1]:
-                    return True
-
-            msg = 'Material Input C: Invalid material thickness. Make sure it is between the specified limits.'
-            return False, msg
-
-        return
+        return check_materials(materials)
 
     @nastran_path.validator
     def nastran_path(self, path):
         """ Verifies if the NASTRAN path exists """
-
-        if not os.path.exists(path):
-            msg = 'NASTRAN folder/executable does not exist. Please install NASTRAN, or correct the folder path.'
-            return False, msg
-
-        return True
+        return check_nastran_path(path)
 
     @bdf_file_folder.validator
     def bdf_file_folder(self, path):
@@ -607,11 +286,7 @@ class WingBoxAssessment(GeomBase):
         :param path:
         :return:
         """
-        if not os.path.isdir(path):
-            msg = 'Folder to save .bdf file does not exist. Please create this folder or correct the folder path.'
-            return False, msg
-
-        return True
+        return check_bdf_file_folder(path)
 
     @min_elem_size.validator
     def min_elem_size(self, value):
@@ -620,11 +295,7 @@ class WingBoxAssessment(GeomBase):
         :param value:
         :return:
         """
-        if value > self.max_elem_size:
-            msg = 'Minimum element size cannot be greater than the maximum element size.'
-            return False, msg
-
-        return True
+        return check_min_elem_size(value, self.max_elem_size)
 
     @secs.validator
     def secs(self, cs_lst):
@@ -633,33 +304,7 @@ class WingBoxAssessment(GeomBase):
         :param cs_lst:
         :return:
         """
-        if len(cs_lst) != 3:
-            msg = 'The number of cross-section descriptions cannot be changed.'
-            return False, msg
-
-        for i in range(len(cs_lst)):
-
-            if (cs_lst[i][1] != 'moms') and (cs_lst[i][1] != 'dims'):
-                msg = 'Cross-section descriptor must be "moms" or "dims".'
-                return False, msg
-
-            if (cs_lst[i][1] == 'moms') and len(cs_lst[i][0]) != 4:
-                msg = 'Cross-section defined on moments of inertia must have four inputs:' \
-                      ' cross-sectional area, moment of inertia in the vertical axes, in the horizontal' \
-                      ' axes, and polar moment of inertia.'
-                return False, msg
-
-            if (cs_lst[i][1] == 'dims') and len(cs_lst[i][0]) != 2:
-                msg = 'Cross-section defined on dimensions must have two inputs:' \
-                      ' vertical and horizontal lengths.'
-                return False, msg
-
-            for j in range(len(cs_lst[i][0])):
-                warn, msg = type_warning(cs_lst[i][0][j], 'cross-sectional dimensions', (float, int))
-                if not warn:
-                    return False, msg
-
-        return True
+        return check_secs(cs_lst)
 
     @bcs.validator
     def bcs(self, bcs_lst):
@@ -669,34 +314,16 @@ class WingBoxAssessment(GeomBase):
         :param bcs_lst:
         :return:
         """
-        if len(bcs_lst) != 3:
-            msg = 'The number of boundary condition descriptions cannot be changed.'
-            return False, msg
-
-        for i in range(3):
-            warn, msg = type_warning(bcs_lst[i][1], 'constricted DOFs', str)
-            if not warn:
-                return False, msg
-
-            if bcs_lst[i][0] != ['root_rib', 'front_spar', 'rear_spar'][i]:
-                msg = 'Boundary condition descriptors cannot be changed.'
-                return False, msg
-
-            decompose = [*bcs_lst[i][1]]
-
-            if len(decompose) != len(set(decompose)):
-                msg = 'DOF indexes cannot be repeated'
-                return False, msg
+        return check_bcs(bcs_lst)
 
-            for j in range(len(decompose)):
-                if decompose[j] not in ['1', '2', '3', '4', '5', '6']:
-                    msg = 'DOF index must be comprised between 1 and 6.'
-                    return False, msg
-                if j > 0 and (decompose[j] < decompose[j-1]):
-                    msg = 'DOF indexes must be ordered in ascending order.'
-                    return False, msg
-
-        return True
+    @output_requests.validator
+    def output_requests(self, requests):
+        """
+        Verifies that there is either one list of output requests for all subcases, or one per load case
+        :param requests:
+        :return:
+        """
+        return check_output_requests(requests, self.case_settings)
 
     # CHILDREN GENERATION
 
@@ -709,7 +336,7 @@ class WingBoxAssessment(GeomBase):
         return WingGeom(pass_down=['root_chord', 'spans', 'tapers',
                                    'sweeps', 'dihedrals', 'twist',
                                    'airfoil_sections', 'airfoil_names',
-                                   'n_sections', 'n_airfoils'])
+                                   'n_sections', 'n_airfoils', 'shape_cache'])
 
     @Part
     def analysis(self):
@@ -729,7 +356,7 @@ class WingBoxAssessment(GeomBase):
         return WingBox(wing=self.wing_geom,
                        color='gray',
                        pass_down=['rib_idx', 'front_spar_loc', 'rear_spar_loc', 'stringer_idx',
-                                  'TE_ribs_gap', 'TE_skin_gap', 'n_sections'])
+                                  'TE_ribs_gap', 'TE_skin_gap', 'n_sections', 'shape_cache'])
 
     @Part
     def FEMFile(self):
@@ -739,22 +366,82 @@ class WingBoxAssessment(GeomBase):
                                 quad_dominance=self.quad_dominance,
                                 min_elem_size=self.min_elem_size,
                                 max_elem_size=self.max_elem_size,
-                                bcs=self.bcs)
+                                bcs=self.bcs,
+                                output_requests=self.output_requests)
+
+    # VIEWS
+    # Display copies of the geometry, tessellated at the level of detail. Only viewers use them.
+
+    @Part
+    def right_wing_view(self):
+        return Compound(built_from=[self.wing_geom.right_wing],
+                        mesh_deflection=deflection(self.lod),
+                        hidden=True)
+
+    @Part
+    def left_wing_view(self):
+        return Compound(built_from=[self.wing_geom.left_wing],
+                        mesh_deflection=deflection(self.lod),
+                        hidden=True)
+
+    @Part
+    def structure_view(self):
+        """ Spars, ribs and stringers of the wingbox """
+        return Compound(built_from=[node for label, node in zip(self.wingbox.node_labels,
+                                                                self.wingbox.STEP_node_list) if label != 'skin'],
+                        mesh_deflection=deflection(self.lod),
+                        color='gray',
+                        hidden=True)
+
+
+    @Attribute
+    def structural_mass(self):
+        """
+        Mass of the wingbox: the area of skin, spars and ribs times the thickness and density of their 2D material,
+        plus the length of the stringers times the cross-section area and density of their 1D material.
+        :return: mass [kg]
+        """
+        inch = 0.0254
+        skin, spars, ribs = [mat_props_finder(mat) for mat in self.mat_2D]
+        stringers = mat_props_finder(self.mat_1D[0])
+        stringer_area = sec_props_finder(self.secs)[0][0]
+
+        shells = {'skin': skin, 'spar': spars, 'rib': ribs}
 
+        mass = 0
+        for label, shape in zip(self.wingbox.node_labels, self.wingbox.STEP_node_list):
+            if label == 'stringer':
+                length = sum(edge.length for edge in shape.edges)
+                mass += length*stringer_area*stringers['rho']
+            else:
+                mat = shells[label]
+                area = sum(face.area for face in shape.faces)
+                mass += area*mat['t']*inch*mat['rho']
+
+        return mass
 
     @Attribute
     def FEMAnalysis(self):
         """ Defines the .bdf file, run it using NASTRAN and sort output data. """
 
-        # Writing .bdf file.
-        file_name = r'\wingbox_bulkdata.bdf'
-        local_file_path = self.bdf_file_folder + file_name
-        base_file = self.FEMFile.FEMWriter.write(local_file_path)
-        global_file_path = os.path.join(os.path.dirname(__file__), r'bdf_files\wingbox_bulkdata.bdf')
+        global_file_path = self.write_bdf()
+        self.run_nastran(global_file_path)
+        self.post_process()
+
+        return None
 
-        # Adding subcases to the .bdf file.
-        case_settings = self.analysis.case_settings[2]
-        bdf_file_cases(global_file_path, case_settings)
+    def write_bdf(self):
+        """ Writes the .bdf file with its subcases and returns its path. """
+
+        # Writing .bdf file, subcases included.
+        local_file_path = os.path.join(self.bdf_file_folder, 'wingbox_bulkdata.bdf')
+        self.FEMFile.write_bdf(local_file_path)
+        global_file_path = os.path.abspath(local_file_path)
+
+        return global_file_path
+
+    def run_nastran(self, global_file_path):
+        """ Runs NASTRAN on the .bdf file and waits for it to finish. """
 
         # Running NASTRAN.
         nastran_command = '"' + self.nastran_path + '" "' + global_file_path + '"'
@@ -769,6 +456,9 @@ class WingBoxAssessment(GeomBase):
 
         print(f"NASTRAN has finished running. Wait for the program to complete its analyses.")
 
+    def post_process(self):
+        """ Sorts the NASTRAN output files, writes the STEP file, plots and reactions. """
+
         # Define source paths for NASTRAN files.
         source_files = {
             'f04': 'wingbox_bulkdata.f04',
@@ -778,8 +468,8 @@ class WingBoxAssessment(GeomBase):
         }
 
         # Define destination directories for NASTRAN files
-        output_data_path = os.path.join(os.path.dirname(__file__), 'output_data')
-        raw_NASTRAN_output_path = os.path.join(os.path.dirname(__file__), r'output_data\raw_NASTRAN_output')
+        output_data_path = os.path.join(os.getcwd(), 'wingbox_code', 'output_data')
+        raw_NASTRAN_output_path = os.path.join(output_data_path, 'raw_NASTRAN_output')
 
         # Copying NASTRAN files to the output data directory.
         for file_key, file_name in source_files.items():
@@ -796,15 +486,14 @@ class WingBoxAssessment(GeomBase):
         get_reactions()
 
         # Interpreting punch file.
-        punch_interpreter(self.FEMFile.mesh.grid.nodes)
+        punch_interpreter(self.FEMFile.mesh_arrays['coords'])
 
         print(f"FEM Analysis has finished running. Check output in the 'output_data' folder.")
 
-        return None
-
     @Part
     def colormaps(self):
-        return Colormap(mesh=self.FEMFile.mesh,
+        from .output_tools.colormap_results import Colormap
+        return Colormap(arrays=self.FEMFile.mesh_arrays,
                         dictn=get_disp_dict(),
                         magnification_factor=1e-6)
 